@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from intent_model import load_model, chatbot, classify_batch
+from response_cache import ResponseCache
+from pattern_matcher import PatternMatcher
+from micro_batcher import MicroBatcher
+
+# Function to sample a replay set from the patterns in intents.json
+def sample_messages(n, seed=0):
+    with open("intents.json", "r") as file:
+        intents = json.load(file)
+    patterns = [pattern for intent in intents for pattern in intent["patterns"]]
+    rng = random.Random(seed)
+    return [rng.choice(patterns) for _ in range(n)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Messages/sec of chatbot() vs classify_batch() at several batch sizes.")
+    parser.add_argument("--messages", type=int, default=8192)
+    parser.add_argument("--batch-sizes", default="1,32,256,4096")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent callers for the micro-batcher run")
+    args = parser.parse_args()
+
+    # The replay set is made of verbatim patterns, which the pattern matcher would answer
+    # without the classifier; an empty matcher sends every message to transform + predict_proba
+    model = dict(load_model(), matcher=PatternMatcher([], []))
+    messages = sample_messages(args.messages)
+
+    # The replay set repeats patterns, so run uncached to measure the classifier itself
+    start = time.perf_counter()
+    for text in messages:
+        chatbot(text, model, cache=None)
+    elapsed = time.perf_counter() - start
+    print(f"{'chatbot() loop':>20}: {len(messages) / elapsed:10.0f} msg/s")
+
+    cache = ResponseCache()
+    start = time.perf_counter()
+    for text in messages:
+        chatbot(text, model, cache=cache)
+    elapsed = time.perf_counter() - start
+    print(f"{'cached chatbot()':>20}: {len(messages) / elapsed:10.0f} msg/s  (hit rate {cache.stats()['hit_rate']:.1%})")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        start = time.perf_counter()
+        for i in range(0, len(messages), batch_size):
+            classify_batch(messages[i:i + batch_size], model, cache=None)
+        elapsed = time.perf_counter() - start
+        print(f"{'batch ' + str(batch_size):>20}: {len(messages) / elapsed:10.0f} msg/s")
+
+    batcher = MicroBatcher(classify=partial(classify_batch, model=model, cache=None))
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        start = time.perf_counter()
+        list(pool.map(batcher.classify_one, messages))
+        elapsed = time.perf_counter() - start
+    batcher.close()
+    print(f"{'micro-batcher x' + str(args.clients):>20}: {len(messages) / elapsed:10.0f} msg/s")
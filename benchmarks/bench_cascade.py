@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split
+from intent_model import load_training_data
+from ensemble import MODEL_FACTORIES, train_cascade_models, parse_cascade, cascade_predict, answered_mask
+
+# Cheap-first cascades and every single model, evaluated with a range of fallback thresholds
+DEFAULT_CONFIGS = [
+    "nb", "logistic", "svm", "rf",
+    "nb:2,rf", "logistic:1.9,rf", "logistic:2,rf", "logistic:2.5,rf", "nb:2,logistic:2,rf", "logistic:2,svm",
+]
+
+# Function to score one configuration: accuracy, fallback/escalation rates and mean latency per message
+def evaluate(x_test, y_test, stages, models, class_tags, fallback_threshold):
+    start = time.perf_counter()
+    for i in range(x_test.shape[0]):
+        cascade_predict(x_test[i], stages, models)
+    latency_ms = (time.perf_counter() - start) / x_test.shape[0] * 1000
+
+    best, confidences, answered_by = cascade_predict(x_test, stages, models)
+    predicted = class_tags[best]
+    answered = answered_mask(confidences, answered_by, stages, fallback_threshold, len(class_tags))
+    correct = (predicted == y_test) & answered
+    return {
+        "accuracy": correct.mean(),
+        "answered_accuracy": correct.sum() / max(answered.sum(), 1),
+        "fallback_rate": 1 - answered.mean(),
+        "escalated": (answered_by > 0).mean(),
+        "latency_ms": latency_ms,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy vs mean latency of cascade configurations on a held-out split of intents.json.")
+    parser.add_argument("--configs", default=";".join(DEFAULT_CONFIGS),
+                        help="';'-separated cascade specs, e.g. 'logistic:2,rf;nb'")
+    parser.add_argument("--fallback-thresholds", default="0,1,2,5,20",
+                        help="last-stage lifts (top probability x number of intents) below which to fall back")
+    args = parser.parse_args()
+
+    # Most tags have only three patterns, so hold out exactly one pattern per tag
+    _, patterns, tags = load_training_data()
+    train_text, test_text, y_train, y_test = train_test_split(
+        patterns, tags, test_size=len(set(tags)), stratify=tags, random_state=42
+    )
+    vectorizer = TfidfVectorizer()
+    x_train = vectorizer.fit_transform(train_text)
+    x_test = vectorizer.transform(test_text)
+    y_test = np.array(y_test)
+
+    start = time.perf_counter()
+    models = train_cascade_models(x_train, y_train)
+    print(f"{len(train_text)} training / {len(test_text)} held-out patterns, "
+          f"{len(set(tags))} tags; trained {', '.join(MODEL_FACTORIES)} in {time.perf_counter() - start:.1f}s\n")
+    class_tags = np.array([str(tag) for tag in models["logistic"].classes_])
+
+    print(f"{'cascade':>26} {'fallback<':>9} {'accuracy':>9} {'answered':>9} {'fallback':>9} {'escalated':>9} {'ms/msg':>8}")
+    for spec in args.configs.split(";"):
+        stages = parse_cascade(spec)
+        for fallback_threshold in [float(t) for t in args.fallback_thresholds.split(",")]:
+            r = evaluate(x_test, y_test, stages, models, class_tags, fallback_threshold)
+            print(f"{spec:>26} {fallback_threshold:9.2f} {r['accuracy']:9.1%} {r['answered_accuracy']:9.1%} "
+                  f"{r['fallback_rate']:9.1%} {r['escalated']:9.1%} {r['latency_ms']:8.3f}")
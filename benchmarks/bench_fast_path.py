@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import random
+import argparse
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from intent_model import load_model, load_training_data, classify_batch
+
+# Function to add one random typo (drop, swap or duplicate a character)
+def add_typo(rng, text):
+    i = rng.randrange(len(text) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + text[i] + text[i:]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency and hit rate of the exact/fuzzy pattern fast path vs the classifier.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_model()
+    _, patterns, tags = load_training_data()
+    rng = random.Random(args.seed)
+    # Novel messages: shuffled words from two different patterns
+    novel = []
+    for _ in range(len(patterns)):
+        words = rng.choice(patterns).split() + rng.choice(patterns).split()
+        rng.shuffle(words)
+        novel.append(" ".join(words))
+    sets = {
+        "verbatim": (patterns, tags),
+        "one typo": ([add_typo(rng, p) if len(p) > 3 else p for p in patterns], tags),
+        "novel": (novel, None),
+    }
+
+    print(f"{'message set':>10} {'exact':>7} {'fuzzy':>7} {'model':>7} {'correct':>8} {'clf only':>8} {'us/msg':>8}")
+    for label, (messages, expected) in sets.items():
+        start = time.perf_counter()
+        results = [classify_batch([message], model, cache=None)[0] for message in messages]
+        elapsed = time.perf_counter() - start
+        paths = Counter(result[3] for result in results)
+        # Accuracy of the served tags vs the classifier alone, on messages with a known intent
+        if expected is not None:
+            probabilities = model["clf"].predict_proba(model["vectorizer"].transform(messages))
+            predicted = [model["class_tags"][i] for i in probabilities.argmax(axis=1)]
+            correct = sum(r[0] == tag for r, tag in zip(results, expected)) / len(messages)
+            clf_correct = sum(p == tag for p, tag in zip(predicted, expected)) / len(messages)
+        else:
+            correct = clf_correct = float("nan")
+        n = len(messages)
+        print(f"{label:>10} {paths['exact'] / n:7.1%} {paths['fuzzy'] / n:7.1%} {paths['model'] / n:7.1%} "
+              f"{correct:8.1%} {clf_correct:8.1%} {elapsed / n * 1e6:8.1f}")
+
+        for path in ("exact", "fuzzy", "model"):
+            selected = [m for m, r in zip(messages, results) if r[3] == path][:200]
+            if not selected:
+                continue
+            start = time.perf_counter()
+            for message in selected:
+                classify_batch([message], model, cache=None)
+            print(f"{'':>10}   {path:>5} path: {(time.perf_counter() - start) / len(selected) * 1e6:8.1f} us/msg")
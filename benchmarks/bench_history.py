@@ -0,0 +1,79 @@
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import datetime
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from chat_history import ChatHistoryStore
+
+WORDS = "hello budget help account password reset bye thanks weather joke music movie".split()
+
+# Function to generate `n` synthetic log rows, one per 10 seconds, oldest first
+def synthetic_rows(n, seed=0):
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(n):
+        timestamp = (start + datetime.timedelta(seconds=10 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        yield (" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))),
+               " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))),
+               timestamp)
+
+# Function to time fn() `repeat` times, returning the median in milliseconds
+def median_ms(fn, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversation History page fetch time at large log sizes.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    csv_path = os.path.join(workdir, "chat_log.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["User Input", "Chatbot Response", "Timestamp"])
+        writer.writerows(synthetic_rows(args.rows))
+
+    start = time.perf_counter()
+    store = ChatHistoryStore(os.path.join(workdir, "history.db"), csv_path, os.path.join(workdir, "archive"))
+    print(f"imported {args.rows} rows in {time.perf_counter() - start:.1f} s (fts: {store.has_fts})")
+
+    # Old page: read every row of the CSV on each render
+    def full_scan():
+        with open(csv_path, "r", encoding="utf-8") as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader)
+            for _ in reader:
+                pass
+    print(f"{'full CSV scan (old page)':>32}: {median_ms(full_scan, repeat=3):9.2f} ms")
+
+    rows, cursor = store.page(args.page_size)
+    cursors = [cursor]
+    for _ in range(200):
+        rows, cursor = store.page(args.page_size, before=cursor)
+        cursors.append(cursor)
+
+    cases = {
+        "newest page": lambda: store.page(args.page_size),
+        "page 200 (keyset)": lambda: store.page(args.page_size, before=cursors[-2]),
+        "one-day time range": lambda: store.page(args.page_size, start="2024-02-01 00:00:00", end="2024-02-01 23:59:59"),
+        "search (common term)": lambda: store.page(args.page_size, search="password"),
+        "search (rare phrase)": lambda: store.page(args.page_size, search="joke joke joke joke"),
+        "search + time range": lambda: store.page(args.page_size, start="2024-02-01 00:00:00",
+                                                  end="2024-02-07 23:59:59", search="budget help"),
+    }
+    for label, fn in cases.items():
+        print(f"{label:>32}: {median_ms(fn):9.2f} ms")
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pdf_index import iter_incremental_indexes, build_sentence_index, get_context_aware_response
+from pdf_jobs import IndexingQueue
+from benchmarks.synthetic_pdf import make_synthetic_pdf, WORDS
+from benchmarks.loadgen import percentile
+
+# Fairness check for PDF indexing: one large upload starts first, then several small ones
+# arrive, while another user keeps querying an already indexed document. Reports how long the
+# small uploads take to finish (and the large one) and the other user's query latency, when
+# every upload indexes in its own thread, as pdfchat.py used to, and through the IndexingQueue.
+
+# Function to query an index in a loop until `stopped` is set, collecting latencies
+def query_loop(index, stopped, timings):
+    i = 0
+    while not stopped.is_set():
+        start = time.perf_counter()
+        get_context_aware_response(f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]}", index)
+        timings.append(time.perf_counter() - start)
+        i += 1
+        time.sleep(0.005)
+
+# Function to run `indexing` while another thread queries, returning (its result, query latencies)
+def with_queries(index, indexing, *args):
+    stopped, timings = threading.Event(), []
+    thread = threading.Thread(target=query_loop, args=(index, stopped, timings))
+    thread.start()
+    try:
+        result = indexing(*args)
+    finally:
+        stopped.set()
+        thread.join()
+    return result, sorted(timings)
+
+# Function to index every upload in its own thread, returning {name: seconds to finish}
+def run_threads(uploads, delay):
+    finished = {}
+    begin = time.perf_counter()
+
+    def index(name, pdf_bytes, submitted):
+        for _ in iter_incremental_indexes(pdf_bytes):
+            pass
+        finished[name] = time.perf_counter() - submitted
+
+    threads = []
+    for i, (name, pdf_bytes) in enumerate(uploads):
+        if i == 1:
+            time.sleep(delay)
+        thread = threading.Thread(target=index, args=(name, pdf_bytes, time.perf_counter()))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return finished, time.perf_counter() - begin
+
+# Function to index the uploads through the queue, returning {name: seconds to finish}
+def run_queue(uploads, delay, queue):
+    finished = {}
+    begin = time.perf_counter()
+    jobs = []
+    for i, (name, pdf_bytes) in enumerate(uploads):
+        if i == 1:
+            time.sleep(delay)
+        submitted = time.perf_counter()
+        on_done = lambda index, name=name, submitted=submitted: finished.__setitem__(name, time.perf_counter() - submitted)
+        jobs.append(queue.submit(name, pdf_bytes, on_index=lambda pages_done, index: None, on_done=on_done))
+    while not all(job["done"] for job in jobs):
+        time.sleep(0.01)
+    return finished, time.perf_counter() - begin
+
+def report(label, result, timings):
+    finished, elapsed = result
+    small = sorted(seconds for name, seconds in finished.items() if name != "large")
+    print(f"{label:>18}: small uploads done in median {small[len(small) // 2]:.2f}s / max {small[-1]:.2f}s, "
+          f"large in {finished['large']:.2f}s, all in {elapsed:.2f}s; other user's queries "
+          f"p50 {percentile(timings, 50) * 1000:.1f} ms / p99 {percentile(timings, 99) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Small-upload latency behind a large upload: threads vs IndexingQueue.")
+    parser.add_argument("--large-pages", type=int, default=400)
+    parser.add_argument("--small-pages", type=int, default=10)
+    parser.add_argument("--small-uploads", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds between the large upload and the small ones")
+    args = parser.parse_args()
+
+    uploads = [("large", make_synthetic_pdf(args.large_pages))]
+    uploads += [(f"small-{i}", make_synthetic_pdf(args.small_pages, seed=i + 1)) for i in range(args.small_uploads)]
+
+    rng_sentences = [" ".join(WORDS[(i * j) % len(WORDS)] for j in range(1, 12)) + "." for i in range(5000)]
+    other_index = build_sentence_index(rng_sentences)
+
+    queue = IndexingQueue()
+    # Spawn the pool's workers before timing anything
+    run_queue(uploads[1:2], 0, queue)
+    solo, _ = run_queue(uploads[1:2], 0, queue)
+    print(f"{'small upload alone':>18}: {solo['small-0']:.2f}s")
+
+    report("thread per upload", *with_queries(other_index, run_threads, uploads, args.delay))
+    report("IndexingQueue", *with_queries(other_index, run_queue, uploads, args.delay, queue))
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every step runs in its own interpreter started from this minimal parent: a child inherits its
+# parent's ru_maxrss high-water mark on Linux, so a parent holding the PDF would hide the build.
+
+# Writes the sentences of a synthetic PDF as JSON and prints the PDF size
+PREPARE_SNIPPET = """
+import io, sys, json
+sys.path.insert(0, sys.argv[3])
+from benchmarks.synthetic_pdf import make_synthetic_pdf
+from pdf_extract import extract_text_from_pdf
+from pdf_index import preprocess_pdf_text
+pdf_bytes = make_synthetic_pdf(int(sys.argv[2]))
+sentences = preprocess_pdf_text(extract_text_from_pdf(io.BytesIO(pdf_bytes)))
+with open(sys.argv[1], "w") as f:
+    json.dump(sentences, f)
+print(json.dumps({"pdf_bytes": len(pdf_bytes), "sentences": len(sentences)}))
+"""
+
+# Peak RSS of the build alone: the high-water mark (VmHWM) is reset to the current RSS once
+# the sentences and scikit-learn are loaded, then read after the build
+MEASURE_PREAMBLE = """
+import sys, json, time
+from sklearn.feature_extraction.text import TfidfVectorizer
+sys.path.insert(0, sys.argv[2])
+sentences = json.load(open(sys.argv[1]))
+
+def memory_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+base_rss = memory_kb("VmRSS")
+start = time.perf_counter()
+"""
+
+MEASURE_RESULT = """
+elapsed = time.perf_counter() - start
+print(json.dumps({"build_s": elapsed, "peak_rss_kb": memory_kb("VmHWM"), "base_rss_kb": base_rss,
+                  "rows": tfidf_matrix.shape[0], "nnz": tfidf_matrix.nnz}))
+"""
+
+# Previous approach: materialize every 1-6 sentence window as a string and vectorize them all
+LEGACY_SNIPPET = MEASURE_PREAMBLE + """
+contexts = []
+for n in range(1, 7):
+    for i in range(len(sentences) - n + 1):
+        contexts.append((" ".join(sentences[i:i + n]), i, i + n - 1))
+vectorizer = TfidfVectorizer()
+tfidf_matrix = vectorizer.fit_transform([c[0] for c in contexts])
+""" + MEASURE_RESULT
+
+# Sentence-level index with window scoring at query time
+SENTENCE_SNIPPET = MEASURE_PREAMBLE + """
+from pdf_index import build_sentence_index
+index = build_sentence_index(sentences, min_n=1, max_n=6)
+tfidf_matrix = index["matrix"]
+""" + MEASURE_RESULT
+
+# Function to run a snippet in a fresh interpreter, returning the JSON it prints last
+def run_isolated(snippet, *args):
+    result = subprocess.run(
+        [sys.executable, "-c", snippet, *args],
+        capture_output=True, text=True, check=True, cwd=REPO_ROOT
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index build time and peak RSS: n-gram contexts vs sentence index.")
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        sentences_path = f.name
+    try:
+        prepared = run_isolated(PREPARE_SNIPPET, sentences_path, str(args.pages), REPO_ROOT)
+        print(f"{args.pages}-page synthetic PDF: {prepared['pdf_bytes'] / 1024 / 1024:.1f} MB, "
+              f"{prepared['sentences']} sentences")
+        for label, snippet in [("n-gram contexts", LEGACY_SNIPPET), ("sentence index", SENTENCE_SNIPPET)]:
+            r = run_isolated(snippet, sentences_path, REPO_ROOT)
+            print(f"{label:>16}: build {r['build_s']:7.2f} s  peak RSS {r['peak_rss_kb'] / 1024:7.1f} MB "
+                  f"(+{(r['peak_rss_kb'] - r['base_rss_kb']) / 1024:.1f} MB)  rows {r['rows']}  nnz {r['nnz']}")
+    finally:
+        os.remove(sentences_path)
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from intent_model import read_or_build_model, swap_model, load_training_data
+from intent_reloader import IntentReloader
+from micro_batcher import MicroBatcher
+from benchmarks.loadgen import percentile
+
+# Hot-reload check: clients keep classifying through the micro-batcher while intents.json is
+# edited repeatedly. Every edit adds a new intent; after each reload the new intent must be
+# answered, and no request may fail while models are swapped.
+
+# Function to write a copy of the intents with `extra` probe intents appended
+def write_intents(path, intents, extra):
+    probes = [{"tag": f"reload_probe_{i}", "patterns": [f"reload probe number {i} zyx{i}"],
+               "responses": [f"probe {i}"]} for i in range(extra)]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(intents + probes, f)
+    os.replace(tmp_path, path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request failures and latency while intents.json is hot-reloaded.")
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.1, help="watcher poll interval (s)")
+    args = parser.parse_args()
+
+    intents, patterns, _ = load_training_data()
+    work_dir = tempfile.mkdtemp()
+    intents_path = os.path.join(work_dir, "intents.json")
+    artifact_path = os.path.join(work_dir, "intent_model.pkl")
+    write_intents(intents_path, intents, 0)
+    swap_model(read_or_build_model(intents_path, artifact_path))
+
+    batcher = MicroBatcher()
+    reloader = IntentReloader(intents_path, interval=args.interval,
+                              build=lambda path: read_or_build_model(path, artifact_path))
+    stopped = threading.Event()
+    timings, failures = [], []
+
+    def client(offset):
+        i = offset
+        while not stopped.is_set():
+            start = time.perf_counter()
+            try:
+                batcher.classify_one(patterns[i % len(patterns)], timeout=30)
+            except Exception as exc:
+                failures.append(repr(exc))
+            timings.append(time.perf_counter() - start)
+            i += args.clients
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    try:
+        for n in range(1, args.reloads + 1):
+            write_intents(intents_path, intents, n)
+            while reloader.reloads < n and reloader.failures == 0:
+                time.sleep(0.01)
+            tag = batcher.classify_one(f"reload probe number {n - 1} zyx{n - 1}")[0]
+            print(f"reload {n}: {reloader.stats()['last_duration_s']:.2f}s, new intent answered: {tag == f'reload_probe_{n - 1}'}")
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+        reloader.close()
+        batcher.close()
+        shutil.rmtree(work_dir)
+
+    stats = reloader.stats()
+    timings.sort()
+    print(f"\n{len(timings)} requests during {stats['reloads']} reloads, {len(failures)} failed "
+          f"({stats['failures']} failed reloads)")
+    print(f"reload duration: mean {stats['mean_duration_s']:.2f}s, max {stats['max_duration_s']:.2f}s")
+    print(f"request latency: p50 {percentile(timings, 50) * 1000:.1f} ms, p99 {percentile(timings, 99) * 1000:.1f} ms, "
+          f"max {timings[-1] * 1000:.1f} ms")
+    if failures:
+        print("first failure:", failures[0])
+        sys.exit(1)
@@ -0,0 +1,68 @@
+import os
+import sys
+import io
+import time
+import random
+import argparse
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_pdf import make_synthetic_pdf, make_part_number, WORDS
+from pdf_extract import extract_text_from_pdf
+from pdf_index import preprocess_pdf_text, build_sentence_index, retrieve_top_k
+
+# Previous approach: score every window of the document with dense prefix sums, then argmax
+def dense_best_window(query, index):
+    query_vec = index["vectorizer"].transform([query])
+    query_norm = np.sqrt(query_vec.multiply(query_vec).sum())
+    if query_norm == 0:
+        return None
+    sentence_scores = np.asarray(index["matrix"] @ query_vec.T.toarray()).ravel() / query_norm
+    prefix = np.concatenate(([0.0], np.cumsum(sentence_scores)))
+    best = (-1.0, 0, 0)
+    for n, norms in enumerate(index["window_norms"], start=index["min_n"]):
+        scores = np.zeros(len(norms))
+        np.divide(prefix[n:] - prefix[:-n], norms, out=scores, where=norms > 0)
+        i = int(np.argmax(scores))
+        if scores[i] > best[0]:
+            best = (scores[i], i, n)
+    return best
+
+# Function to time fn(query) over a query set, returning (p50, p99) in milliseconds
+def time_queries(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.99)] * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-query retrieval latency vs. document size.")
+    parser.add_argument("--pages", default="10,50,200,1000")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'sentences':>10} {'queries':>8} | {'dense p50':>10} {'p99':>8} | "
+          f"{'top-1 p50':>10} {'p99':>8} | {'top-' + str(args.k) + ' p50':>10} {'p99':>8}  (ms)")
+    for pages in [int(p) for p in args.pages.split(",")]:
+        sentences = preprocess_pdf_text(extract_text_from_pdf(io.BytesIO(make_synthetic_pdf(pages))))
+        index = build_sentence_index(sentences)
+
+        # "common": frequent words that match most sentences; "specific": part number lookups
+        rng = random.Random(1)
+        query_sets = {
+            "common": [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) for _ in range(args.queries)],
+            "specific": [" ".join(make_part_number(rng, pages) for _ in range(rng.randint(1, 2)))
+                         for _ in range(args.queries)],
+        }
+        for label, queries in query_sets.items():
+            dense = time_queries(lambda q: dense_best_window(q, index), queries)
+            top1 = time_queries(lambda q: retrieve_top_k(q, index, k=1), queries)
+            topk = time_queries(lambda q: retrieve_top_k(q, index, k=args.k, non_overlapping=True), queries)
+            print(f"{pages:>6} {len(sentences):>10} {label:>8} | {dense[0]:>10.3f} {dense[1]:>8.3f} | "
+                  f"{top1[0]:>10.3f} {top1[1]:>8.3f} | {topk[0]:>10.3f} {topk[1]:>8.3f}")
@@ -0,0 +1,45 @@
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start as it was: train from intents.json at import
+RETRAIN_SNIPPET = """
+import time
+start = time.perf_counter()
+import intent_model
+intent_model.train_model()
+print(time.perf_counter() - start)
+"""
+
+# Cold start now: load the compiled artifact
+LOAD_SNIPPET = """
+import time
+start = time.perf_counter()
+import intent_model
+intent_model.load_model()
+print(time.perf_counter() - start)
+"""
+
+# Function to time a snippet in a fresh interpreter (so nothing is cached in-process)
+def time_fresh_process(snippet):
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure intent model cold-start time before/after the artifact.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Make sure the artifact exists and is fresh before measuring loads
+    time_fresh_process(LOAD_SNIPPET)
+
+    for label, snippet in [("retrain at import", RETRAIN_SNIPPET), ("load artifact", LOAD_SNIPPET)]:
+        timings = sorted(time_fresh_process(snippet) for _ in range(args.runs))
+        print(f"{label:>18}: median {timings[len(timings) // 2] * 1000:8.1f} ms  "
+              f"min {timings[0] * 1000:8.1f} ms  max {timings[-1] * 1000:8.1f} ms")
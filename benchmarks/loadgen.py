@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Function to sample request bodies from the patterns in intents.json
+def sample_messages(n, seed=0):
+    with open(os.path.join(REPO_ROOT, "intents.json"), "r") as file:
+        intents = json.load(file)
+    patterns = [pattern for intent in intents for pattern in intent["patterns"]]
+    rng = random.Random(seed)
+    return [rng.choice(patterns) for _ in range(n)]
+
+# Function to return the p-th percentile of an already sorted list
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float("nan")
+    idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+# One keep-alive connection sending its share of requests back to back
+async def client(host, port, messages, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for message in messages:
+            body = json.dumps({"message": message}).encode("utf-8")
+            request = (f"POST /chat HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b" 200 " not in status_line:
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+async def run(url, concurrency, total):
+    parts = urlsplit(url)
+    messages = sample_messages(total)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(parts.hostname, parts.port or 80, messages[i::concurrency], latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"requests: {len(latencies)}  errors: {len(errors)}  concurrency: {concurrency}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.2f} ms  "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms  max: {latencies[-1] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test inference_server.py and report p50/p99 latency.")
+    parser.add_argument("--url", default="http://127.0.0.1:8600")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests))
@@ -0,0 +1,160 @@
+import os
+import sys
+import ast
+import json
+import argparse
+import importlib.util
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Apps to profile; the modules each one loads at startup are read from its imports
+ENTRY_POINTS = ["chatbot.py", "pdfchat.py"]
+
+# Any connection attempt fails the run, so CI proves startup never touches the network
+NO_NETWORK = """
+import socket
+def _blocked(*args, **kwargs):
+    raise RuntimeError("network access during startup")
+socket.socket.connect = _blocked
+socket.create_connection = _blocked
+"""
+
+# Cold start to the first intent answer
+INTENT_SNIPPET = NO_NETWORK + """
+import time
+start = time.perf_counter()
+from intent_model import load_model, chatbot
+load_model()
+chatbot("Hello")
+print(time.perf_counter() - start)
+"""
+
+# Cold start to the first PDF answer (10-page synthetic manual, indexed in-process)
+PDF_SNIPPET = NO_NETWORK + """
+import time
+from benchmarks.synthetic_pdf import make_synthetic_pdf
+pdf_bytes = make_synthetic_pdf(10)
+start = time.perf_counter()
+from pdf_index import iter_incremental_indexes
+from pdf_corpus import new_corpus, add_document, get_corpus_response
+for _, index in iter_incremental_indexes(pdf_bytes, workers=0):
+    pass
+corpus = new_corpus()
+add_document(corpus, "doc", "manual.pdf", index)
+get_corpus_response("How do I reset the network settings?", corpus)
+print(time.perf_counter() - start)
+"""
+
+def is_repo_module(name):
+    return os.path.exists(os.path.join(REPO_ROOT, name + ".py"))
+
+# Function to list the non-standard-library modules a file imports at module level (imports
+# inside functions are lazy and guarded ones in try blocks optional, so neither is listed)
+def module_imports(path):
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module.split(".")[0])
+    return [name for name in dict.fromkeys(names) if name not in sys.stdlib_module_names]
+
+# Function to list the modules a file loads at startup: the repo modules it imports, directly
+# or through other repo modules (each after its own imports), and the packages they import
+def startup_modules(path, seen=None):
+    seen = set() if seen is None else seen
+    modules = []
+    for name in module_imports(path):
+        if name in seen:
+            continue
+        seen.add(name)
+        if is_repo_module(name):
+            modules.extend(startup_modules(os.path.join(REPO_ROOT, name + ".py"), seen))
+        modules.append(name)
+    return modules
+
+# Function to list the packages a module needs at startup that are not installed
+def missing_packages(name):
+    if not is_repo_module(name):
+        return [] if importlib.util.find_spec(name) is not None else [name]
+    return [dep for dep in startup_modules(os.path.join(REPO_ROOT, name + ".py"))
+            if not is_repo_module(dep) and importlib.util.find_spec(dep) is None]
+
+# Function to run a snippet in a fresh interpreter, returning (stdout, stderr)
+def run_fresh(snippet, *flags):
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", snippet],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout, result.stderr
+
+# Function to import modules with -X importtime. Returns {module: cumulative seconds} for
+# the given modules and {dependency: cumulative seconds} for what each of them imported
+# directly (a dependency is charged to the first module that imports it).
+def profile_imports(modules):
+    snippet = NO_NETWORK + "".join(f"import {name}\n" for name in modules)
+    _, stderr = run_fresh(snippet, "-X", "importtime")
+    totals, dependencies, children = {}, {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # Header row
+        # Nested imports are indented two spaces per level and printed before their importer
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        seconds = int(cumulative_us) / 1e6
+        if depth == 1:
+            children[name] = seconds
+        elif depth == 0:
+            if name in modules:
+                totals[name] = seconds
+                dependencies.update(children)
+            children = {}
+    return totals, dependencies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup profile: import time per module and time to first response, offline.")
+    parser.add_argument("--top", type=int, default=10, help="heaviest dependencies to list per entry point")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--budget-ms", type=float, help="exit 1 if any time to first response exceeds this")
+    args = parser.parse_args()
+
+    report = {"imports": {}, "first_response_s": {}}
+    for entry in ENTRY_POINTS:
+        modules = startup_modules(os.path.join(REPO_ROOT, entry))
+        # Modules needing a package that is not installed (e.g. streamlit) cannot be imported here
+        available = [name for name in modules if not missing_packages(name)]
+        skipped = [name for name in modules if name not in available]
+        not_installed = sorted({package for name in skipped for package in missing_packages(name)})
+        totals, dependencies = profile_imports(available)
+        total = sum(totals.values())
+        heaviest = sorted(dependencies, key=dependencies.get, reverse=True)[:args.top]
+        report["imports"][entry] = {"total_s": total, "modules": totals,
+                                    "dependencies": {name: dependencies[name] for name in heaviest},
+                                    "skipped": skipped, "not_installed": not_installed}
+
+        print(f"{entry}: imports take {total * 1000:.0f} ms" + (
+            f" (not installed: {', '.join(not_installed)}; skipped {', '.join(skipped)})" if skipped else ""))
+        for name in available:
+            print(f"    {name:<28} {totals.get(name, 0) * 1000:8.1f} ms")
+        print("  heaviest dependencies:")
+        for name in heaviest:
+            print(f"    {name:<28} {dependencies[name] * 1000:8.1f} ms")
+
+    for label, snippet in [("intent answer", INTENT_SNIPPET), ("pdf answer", PDF_SNIPPET)]:
+        stdout, _ = run_fresh(snippet)
+        report["first_response_s"][label] = float(stdout.strip().splitlines()[-1])
+        print(f"time to first {label}: {report['first_response_s'][label] * 1000:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and max(report["first_response_s"].values()) * 1000 > args.budget_ms:
+        print(f"over budget ({args.budget_ms:.0f} ms)", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import importlib
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.loadgen import percentile
+
+# Reproducible end-to-end benchmark suite, offline and CPU-only.
+#
+# Every scenario runs in a fresh interpreter and reports timings, peak memory (added_rss_mb
+# is the peak above the RSS once inputs and libraries are loaded, see reset_peak_rss()),
+# per-query latency percentiles and throughput:
+#   intents/<tags>  train on a synthetic intents file, then classify paraphrased patterns
+#   pdf/<pages>     extract and sentence-split a synthetic PDF, build its index, then answer
+#                   common-word and part-number queries with get_context_aware_response
+# Each scenario is repeated and the best value of every metric kept.
+# Results are written as JSON and compared against a stored baseline; a metric that is worse
+# than the baseline by more than --tolerance is reported as a regression.
+
+PRESETS = {
+    "quick": {"intents": [50, 200], "pdf": [10, 100]},
+    "full": {"intents": [50, 200, 1000, 5000], "pdf": [10, 100, 500, 1000]},
+}
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+# Latency changes smaller than this are scheduler noise, not regressions
+MIN_LATENCY_CHANGE_MS = 0.5
+
+# Function to time fn(query) for every query, returning latency percentiles (ms) and throughput
+def measure_queries(fn, queries, prefix):
+    timings = []
+    start = time.perf_counter()
+    for query in queries:
+        query_start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - query_start)
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    return {
+        f"{prefix}_p50_ms": percentile(timings, 50) * 1000,
+        f"{prefix}_p95_ms": percentile(timings, 95) * 1000,
+        f"{prefix}_p99_ms": percentile(timings, 99) * 1000,
+        f"{prefix}_queries_per_s": len(queries) / elapsed,
+    }
+
+# Function to read a memory field (VmRSS, VmHWM) of this process in MB, None without /proc
+def proc_memory_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+# Function to restart the peak RSS from the current RSS, returning that RSS (MB). A scenario
+# calls it once its inputs and libraries are loaded, so added_rss_mb is the measured work only.
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        # No /proc (e.g. macOS): ru_maxrss cannot be reset, so the baseline is its current value
+        return peak_rss_mb()
+    return proc_memory_mb("VmRSS")
+
+def peak_rss_mb():
+    peak = proc_memory_mb("VmHWM")
+    if peak is not None:
+        return peak
+    import resource
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+# Scenario: train the intent model on `size` synthetic tags and classify paraphrases
+def run_intents(size, n_queries):
+    import tempfile
+    from benchmarks.synthetic_intents import make_synthetic_intents, make_intent_queries
+    from intent_model import train_model, classify_batch
+    # Imported lazily by training; loaded up front so they do not count as training memory
+    from nlp_resources import get_lemmatizer
+    importlib.import_module("sklearn.feature_extraction.text")
+    importlib.import_module("sklearn.linear_model")
+    get_lemmatizer()
+
+    intents = make_synthetic_intents(size)
+    queries = make_intent_queries(intents, n_queries)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(intents, f)
+        intents_path = f.name
+    try:
+        base_rss = reset_peak_rss()
+        start = time.perf_counter()
+        model = train_model(intents_path)
+        train_s = time.perf_counter() - start
+    finally:
+        os.remove(intents_path)
+
+    metrics = {"train_s": train_s}
+    # Uncached, so every query pays for vectorize + predict (or the pattern fast path)
+    metrics.update(measure_queries(lambda q: classify_batch([q], model, cache=None), queries, "query"))
+    start = time.perf_counter()
+    for i in range(0, len(queries), 256):
+        classify_batch(queries[i:i + 256], model, cache=None)
+    metrics["batch_messages_per_s"] = len(queries) / (time.perf_counter() - start)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    metrics["added_rss_mb"] = metrics["peak_rss_mb"] - base_rss
+    size_info = {"tags": size, "patterns": sum(len(i["patterns"]) for i in intents), "queries": len(queries)}
+    return {"size": size_info, "metrics": metrics}
+
+# Scenario: ingest a `size`-page synthetic PDF and answer queries against it
+def run_pdf(size, n_queries):
+    from benchmarks.synthetic_pdf import make_synthetic_pdf, make_part_number, WORDS
+    from pdf_extract import iter_pdf_pages, iter_page_sentences
+    from pdf_index import build_sentence_index, get_context_aware_response
+    # Imported lazily by sentence splitting and the index build; loaded before the baseline
+    from nlp_resources import sent_tokenize
+    importlib.import_module("sklearn.feature_extraction.text")
+    sent_tokenize("Warm up.")
+
+    pdf_bytes = make_synthetic_pdf(size)
+    base_rss = reset_peak_rss()
+    start = time.perf_counter()
+    sentences, pages = [], []
+    for sentence, page in iter_page_sentences(iter_pdf_pages(pdf_bytes, workers=0)):
+        sentences.append(sentence)
+        pages.append(page)
+    extract_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index = build_sentence_index(sentences, pages=pages)
+    index_build_s = time.perf_counter() - start
+
+    rng = random.Random(1)
+    common = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) for _ in range(n_queries)]
+    specific = [" ".join(make_part_number(rng, size) for _ in range(rng.randint(1, 2))) for _ in range(n_queries)]
+
+    metrics = {"extract_s": extract_s, "index_build_s": index_build_s}
+    metrics.update(measure_queries(lambda q: get_context_aware_response(q, index), common, "common"))
+    metrics.update(measure_queries(lambda q: get_context_aware_response(q, index), specific, "specific"))
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    metrics["added_rss_mb"] = metrics["peak_rss_mb"] - base_rss
+    size_info = {"pages": size, "pdf_mb": len(pdf_bytes) / 1024 / 1024, "sentences": len(sentences)}
+    return {"size": size_info, "metrics": metrics}
+
+SCENARIOS = {"intents": run_intents, "pdf": run_pdf}
+
+# Function to run one scenario in a fresh interpreter and return its result
+def run_isolated(scenario, size, n_queries):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", scenario, "--size", str(size), "--queries", str(n_queries)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# Function to tell whether a larger value of a metric is better
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+# Function to run a scenario `repeat` times and keep the best value of every metric,
+# which filters out most interference from other processes on the machine
+def run_best_of(scenario, size, n_queries, repeat):
+    runs = [run_isolated(scenario, size, n_queries) for _ in range(repeat)]
+    best = runs[0]
+    for run in runs[1:]:
+        for metric, value in run["metrics"].items():
+            pick = max if higher_is_better(metric) else min
+            best["metrics"][metric] = pick(best["metrics"][metric], value)
+    return best
+
+# Function to list (scenario, metric, baseline, current, change) for metrics worse than tolerance
+def find_regressions(baseline, current, tolerance):
+    regressions = []
+    for key, result in current["results"].items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            continue
+        for metric, value in result["metrics"].items():
+            before = reference["metrics"].get(metric)
+            if not before:
+                continue
+            if metric.endswith("_ms") and abs(value - before) < MIN_LATENCY_CHANGE_MS:
+                continue
+            change = (value - before) / before
+            worse = -change if higher_is_better(metric) else change
+            if worse > tolerance:
+                regressions.append((key, metric, before, value, change))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite: training, indexing, memory, latency and throughput.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--intent-sizes", help="comma-separated tag counts (overrides the preset)")
+    parser.add_argument("--pdf-pages", help="comma-separated page counts (overrides the preset)")
+    parser.add_argument("--queries", type=int, default=300, help="queries per query set")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best value of each metric is kept")
+    parser.add_argument("--output", help=f"results file (default: {os.path.relpath(RESULTS_DIR, REPO_ROOT)}/<timestamp>.json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before flagging")
+    parser.add_argument("--worker", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(SCENARIOS[args.worker](args.size, args.queries)))
+        sys.exit(0)
+
+    sizes = dict(PRESETS[args.preset])
+    if args.intent_sizes:
+        sizes["intents"] = [int(s) for s in args.intent_sizes.split(",")]
+    if args.pdf_pages:
+        sizes["pdf"] = [int(s) for s in args.pdf_pages.split(",")]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "queries": args.queries,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for scenario, scenario_sizes in sizes.items():
+        for size in scenario_sizes:
+            key = f"{scenario}/{size}"
+            result = run_best_of(scenario, size, args.queries, args.repeat)
+            report["results"][key] = result
+            summary = ", ".join(f"{name} {value:.3g}" for name, value in result["metrics"].items())
+            print(f"{key:>14}: {summary}", flush=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(baseline, report, args.tolerance)
+        for key, metric, before, value, change in regressions:
+            print(f"REGRESSION {key} {metric}: {before:.4g} -> {value:.4g} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
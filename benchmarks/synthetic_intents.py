@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+import random
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_pdf import WORDS
+
+# Question templates in the style of intents.json patterns
+TEMPLATES = [
+    "What is {a}?", "How do I {b} my {a}?", "Can you help me with {a} {c}?", "Tell me about {a} and {c}",
+    "Why does my {a} {b}?", "Where can I find {c} {a}?", "Is it possible to {b} {a}?", "{a} {c} help",
+]
+
+# Function to make a reproducible pronounceable word, used as a tag's topic vocabulary
+def make_word(rng):
+    return "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+# Function to generate an intents.json-style list with `tags` intents.
+# Every intent has its own topic words, shared filler words and templates, and a few responses.
+def make_synthetic_intents(tags=200, patterns_per_tag=4, responses_per_tag=3, seed=0):
+    rng = random.Random(seed)
+    intents = []
+    for i in range(tags):
+        topic = [make_word(rng) for _ in range(3)]
+        patterns = []
+        for _ in range(patterns_per_tag):
+            template = rng.choice(TEMPLATES)
+            patterns.append(template.format(a=rng.choice(topic), b=rng.choice(WORDS), c=rng.choice(topic + WORDS)))
+        intents.append({
+            "tag": f"tag_{i:05d}",
+            "patterns": patterns,
+            "responses": [f"Answer {j} about {' '.join(topic)}." for j in range(responses_per_tag)],
+        })
+    return intents
+
+# Function to make queries that are not verbatim patterns: a pattern's words shuffled, one dropped
+def make_intent_queries(intents, n, seed=1):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        words = rng.choice(rng.choice(intents)["patterns"]).split()
+        rng.shuffle(words)
+        if len(words) > 2:
+            words.pop(rng.randrange(len(words)))
+        queries.append(" ".join(words))
+    return queries
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic intents.json for benchmarks.")
+    parser.add_argument("output")
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.output, "w") as f:
+        json.dump(make_synthetic_intents(args.tags, seed=args.seed), f, indent=2)
@@ -0,0 +1,71 @@
+import random
+import argparse
+
+# Small vocabulary of manual-like words so TF-IDF has realistic overlap between sentences
+WORDS = (
+    "system device battery power cable screen button menu settings network update firmware "
+    "install remove replace check press hold release connect disconnect restart reset error "
+    "warning light indicator mode display sound volume channel signal level temperature "
+    "filter water pressure valve pump motor speed timer schedule cycle program memory card "
+    "storage file folder backup restore account password user access security key lock "
+    "unit module sensor panel cover screw bracket mount wall floor surface cleaning service"
+).split()
+
+# Function to generate a part number, the rare terms that make a manual's vocabulary grow with its size
+def make_part_number(rng, pages):
+    return f"p{rng.randrange(pages * 40):06d}"
+
+# Function to generate a reproducible sentence (half of them mention a part number)
+def make_sentence(rng, pages=500):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(1, len(words)), make_part_number(rng, pages))
+    return words[0].capitalize() + " " + " ".join(words[1:]) + "."
+
+# Function to escape text for a PDF string literal
+def pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+# Function to build a minimal valid PDF with `pages` pages of synthetic text, returned as bytes
+def make_synthetic_pdf(pages=500, lines_per_page=45, seed=0):
+    rng = random.Random(seed)
+    objects = []
+
+    # 1: catalog, 2: page tree, 3: font; then a (page, content stream) pair per page
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page_id in page_ids:
+        lines = []
+        while len(lines) < lines_per_page:
+            lines.append(make_sentence(rng, pages)[:95])
+        stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({pdf_escape(line)}) '" for line in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(out)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic text PDF for benchmarks.")
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.output, "wb") as f:
+        f.write(make_synthetic_pdf(args.pages, seed=args.seed))
@@ -0,0 +1,180 @@
+import os
+import csv
+import sqlite3
+import time
+import threading
+from chat_log import LOG_PATH, ARCHIVE_DIR, HEADER, list_archives, read_archive
+
+HISTORY_DB_PATH = os.path.abspath("chat_history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    user_input TEXT NOT NULL,
+    response TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS transcript_turns (
+    session_id TEXT NOT NULL,
+    transcript TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (session_id, transcript, seq)
+) WITHOUT ROWID;
+"""
+
+# Spilled transcript turns are only needed while their session is alive
+TRANSCRIPT_RETENTION_SECONDS = 7 * 24 * 3600
+
+# Trigram full-text index for substring search (SQLite >= 3.34); LIKE is used without it
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    user_input, response, content='messages', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, user_input, response) VALUES (new.id, new.user_input, new.response);
+END;
+"""
+
+# Conversation history store backing the "Conversation History" page.
+#
+# Rows live in SQLite with an index on (timestamp, id), so a page is fetched with keyset
+# pagination ("the N rows before this cursor") in constant time no matter how deep it is or
+# how large the log grows. On first use it imports the existing chat_log.csv and archived
+# segments; after that ChatLogWriter appends every batch it writes.
+class ChatHistoryStore:
+    def __init__(self, path=HISTORY_DB_PATH, log_path=LOG_PATH, archive_dir=ARCHIVE_DIR):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self._import_existing_logs(log_path, archive_dir)
+        self.prune_turns()
+
+    # One connection per thread (Streamlit sessions and the log flusher run on different threads)
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Function to import the CSV log and its archives once, when the database is new
+    def _import_existing_logs(self, log_path, archive_dir):
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone():
+                return
+            for archive_path in list_archives(archive_dir):
+                columns = read_archive(archive_path)
+                self._insert(conn, zip(*(columns[name] for name in HEADER)))
+            if os.path.exists(log_path):
+                with open(log_path, 'r', newline='', encoding='utf-8') as csvfile:
+                    reader = csv.reader(csvfile)
+                    next(reader, None)  # Skip the header row
+                    self._insert(conn, (row[:3] for row in reader if len(row) >= 3))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('imported', '1')")
+
+    def _insert(self, conn, rows):
+        conn.executemany("INSERT INTO messages (user_input, response, timestamp) VALUES (?, ?, ?)", rows)
+
+    # Function to append [user_input, response, timestamp] rows in one transaction
+    def append_rows(self, rows):
+        conn = self._connect()
+        with conn:
+            self._insert(conn, rows)
+
+    # Function to fetch one page, newest first. Returns (rows, next_cursor); rows are
+    # (id, user_input, response, timestamp) and next_cursor is passed as `before` to get the
+    # following (older) page, or None when there are no more rows.
+    def page(self, limit=20, before=None, start=None, end=None, search=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("m.timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("m.timestamp <= ?")
+            params.append(end)
+
+        if search and self.has_fts and len(search) >= 3:
+            # Walk the full-text matches newest first (rows are appended in time order, so
+            # rowid order is time order) and stop after one page
+            sql = ("SELECT m.id, m.user_input, m.response, m.timestamp "
+                   "FROM messages_fts f JOIN messages m ON m.id = f.rowid WHERE messages_fts MATCH ?")
+            params.insert(0, '"' + search.replace('"', '""') + '"')
+            # Turn the time range into rowid bounds so the walk starts and stops inside it
+            conn = self._connect()
+            if start is not None:
+                first = conn.execute("SELECT id FROM messages WHERE timestamp >= ? "
+                                     "ORDER BY timestamp, id LIMIT 1", (start,)).fetchone()
+                clauses.append("f.rowid >= ?")
+                params.append(first[0] if first else float("inf"))
+            if end is not None:
+                last = conn.execute("SELECT id FROM messages WHERE timestamp <= ? "
+                                    "ORDER BY timestamp DESC, id DESC LIMIT 1", (end,)).fetchone()
+                clauses.append("f.rowid <= ?")
+                params.append(last[0] if last else -1)
+            if before is not None:
+                clauses.append("f.rowid < ?")
+                params.append(before[1])
+            order = " ORDER BY f.rowid DESC"
+        else:
+            sql = "SELECT m.id, m.user_input, m.response, m.timestamp FROM messages m WHERE 1"
+            if search:
+                pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                clauses.append("(m.user_input LIKE ? ESCAPE '\\' OR m.response LIKE ? ESCAPE '\\')")
+                params.extend([pattern, pattern])
+            if before is not None:
+                clauses.append("(m.timestamp, m.id) < (?, ?)")
+                params.extend(before)
+            order = " ORDER BY m.timestamp DESC, m.id DESC"
+
+        for clause in clauses:
+            sql += " AND " + clause
+        sql += order + " LIMIT ?"
+        # Fetch one extra row to know whether an older page exists
+        rows = self._connect().execute(sql, params + [limit + 1]).fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            return rows, (last[3], last[0])
+        return rows, None
+
+    # Function to move the oldest turns of a session's transcript out of memory.
+    # turns are (seq, sender, message) with seq increasing within the transcript.
+    def spill_turns(self, session_id, transcript, turns):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO transcript_turns (session_id, transcript, seq, sender, message, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(session_id, transcript, seq, sender, message, now) for seq, sender, message in turns]
+            )
+
+    # Function to read up to `limit` spilled turns before seq `before`, oldest first
+    def load_turns(self, session_id, transcript, before, limit):
+        rows = self._connect().execute(
+            "SELECT seq, sender, message FROM transcript_turns "
+            "WHERE session_id = ? AND transcript = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+            (session_id, transcript, before, limit)
+        ).fetchall()
+        return rows[::-1]
+
+    # Function to delete spilled turns of sessions that are long gone
+    def prune_turns(self, max_age=TRANSCRIPT_RETENTION_SECONDS):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM transcript_turns WHERE created < ?", (time.time() - max_age,))
@@ -0,0 +1,196 @@
+import os
+import io
+import sys
+import csv
+import gzip
+import json
+import time
+import queue
+import atexit
+import datetime
+import threading
+from telemetry import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+LOG_PATH = os.path.abspath("chat_log.csv")
+ARCHIVE_DIR = os.path.abspath("chat_archive")
+HEADER = ['User Input', 'Chatbot Response', 'Timestamp']
+MAX_SEGMENT_BYTES = 10 * 1024 * 1024
+
+# Function to hold an exclusive lock on an open file (no-op where fcntl is unavailable)
+def lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+# Background writer for the conversation log.
+#
+# log() only enqueues a row; a flusher thread appends queued rows to chat_log.csv in
+# batches, each batch as one locked write so several processes can share the file
+# without interleaving. When the active file passes max_bytes or a new day starts, it is
+# rotated out and compacted into a gzip-compressed columnar JSON segment in archive_dir
+# (one list per column). Pending rows are flushed at interpreter exit. If a history store
+# (chat_history.ChatHistoryStore) is given, every batch is also appended to it. Failed
+# batches are reported on stderr and counted in write_failures / history_failures.
+class ChatLogWriter:
+    def __init__(self, path=LOG_PATH, archive_dir=ARCHIVE_DIR, max_bytes=MAX_SEGMENT_BYTES,
+                 flush_interval=0.5, max_batch=500, history_store=None):
+        self.path = path
+        self.history_store = history_store
+        self.archive_dir = archive_dir
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.write_failures = 0
+        self.history_failures = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Function to queue one conversation turn (never blocks on disk)
+    def log(self, user_input, response, timestamp=None):
+        if timestamp is None:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._queue.put([user_input, response, timestamp])
+
+    # Function to block until every row queued so far is on disk
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, events, stop = [], [], False
+            # Gather whatever else arrives within the flush interval, up to max_batch rows
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    batch.append(item)
+                if stop or events or len(batch) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError as exc:
+                    self.write_failures += 1
+                    print(f"chat log: failed to write {len(batch)} rows ({self.write_failures} failed batches): {exc}",
+                          file=sys.stderr)
+                if self.history_store is not None:
+                    try:
+                        self.history_store.append_rows(batch)
+                    except Exception as exc:
+                        self.history_failures += 1
+                        print(f"chat history: failed to store {len(batch)} rows ({self.history_failures} failed batches): {exc}",
+                              file=sys.stderr)
+            for event in events:
+                event.set()
+            if stop:
+                return
+
+    # Function to append a batch as a single locked write, rotating first if needed
+    def _write_batch(self, batch):
+        with span("csv_write"):
+            self._write_batch_locked(batch)
+
+    def _write_batch_locked(self, batch):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        rotated = None
+        while True:
+            with open(self.path, 'a', newline='', encoding='utf-8') as csvfile:
+                lock_file(csvfile)
+                try:
+                    if not self._is_current(csvfile):
+                        # Another process rotated the file while we waited for the lock
+                        continue
+                    if self._should_rotate(csvfile):
+                        rotated = self._rotate()
+                        continue
+                    if os.fstat(csvfile.fileno()).st_size == 0:
+                        csv.writer(csvfile).writerow(HEADER)
+                    csvfile.write(buffer.getvalue())
+                    csvfile.flush()
+                    break
+                finally:
+                    unlock_file(csvfile)
+        if rotated is not None:
+            compact_segment(rotated)
+
+    def _is_current(self, csvfile):
+        try:
+            return os.stat(self.path).st_ino == os.fstat(csvfile.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _should_rotate(self, csvfile):
+        size = os.fstat(csvfile.fileno()).st_size
+        if size <= len(",".join(HEADER)) + 2:
+            return False
+        if size >= self.max_bytes:
+            return True
+        modified = datetime.date.fromtimestamp(os.fstat(csvfile.fileno()).st_mtime)
+        return modified != datetime.date.today()
+
+    # Function to move the active log into the archive directory, returning the segment path
+    def _rotate(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        segment = os.path.join(self.archive_dir, f"chat_log-{stamp}-{os.getpid()}.csv")
+        os.replace(self.path, segment)
+        return segment
+
+# Function to compact a rotated CSV segment into <segment>.columns.json.gz and delete the CSV
+def compact_segment(segment):
+    columns = {name: [] for name in HEADER}
+    with open(segment, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None)  # Skip the header row
+        for row in reader:
+            for name, value in zip(HEADER, row):
+                columns[name].append(value)
+    archive_path = segment[:-len(".csv")] + ".columns.json.gz"
+    tmp_path = archive_path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(columns, f)
+    os.replace(tmp_path, archive_path)
+    os.remove(segment)
+    return archive_path
+
+# Function to read a compacted segment back as {column: [values]}
+def read_archive(archive_path):
+    with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+# Function to list compacted segments, oldest first
+def list_archives(archive_dir=ARCHIVE_DIR):
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(os.path.join(archive_dir, name) for name in os.listdir(archive_dir)
+                  if name.endswith(".columns.json.gz"))
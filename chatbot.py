@@ -1,17 +1,14 @@
 import os
-import json
 import datetime
-import csv
-import nltk
-import ssl
 import streamlit as st
-import random
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-
-ssl._create_default_https_context = ssl._create_unverified_context
-nltk.data.path.append(os.path.abspath("nltk_data"))
-nltk.download('punkt')
+from intent_model import load_model, chatbot
+from intent_reloader import IntentReloader
+from inference_client import chatbot_remote
+from chat_log import ChatLogWriter
+from ui_theme import init_theme, theme_toggle
+from transcript import get_history_store, get_transcript, append_turn, render_transcript
+from telemetry import start_exporters, request
+from pdfchat import pdf_chat_page
 
 # Set page config as the first Streamlit command
 st.set_page_config(
@@ -20,205 +17,77 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load intents from the JSON file
-file_path = os.path.abspath("intents.json")
-with open(file_path, "r") as file:
-    intents = json.load(file)
-
-# Create the vectorizer and classifier
-vectorizer = TfidfVectorizer()
-clf = LogisticRegression(random_state=0, max_iter=10000)
-
-# Preprocess the data
-tags = []
-patterns = []
-for intent in intents:
-    for pattern in intent['patterns']:
-        tags.append(intent['tag'])
-        patterns.append(pattern)
-
-# Training the model
-x = vectorizer.fit_transform(patterns)
-y = tags
-clf.fit(x, y)
-
-def chatbot(input_text):
-    input_text = vectorizer.transform([input_text])
-    tag = clf.predict(input_text)[0]
-    for intent in intents:
-        if intent['tag'] == tag:
-            response = random.choice(intent['responses'])
-            return response
-        
+# With NEBULA_SERVER_URL set, this page is a thin client of inference_server.py;
+# otherwise load the compiled intent model in-process (retrained only when intents.json changes)
+SERVER_URL = os.environ.get("NEBULA_SERVER_URL")
+
+# One model and intents.json watcher per process: edits are retrained in the background and
+# swapped in without restarting Streamlit
+@st.cache_resource
+def get_intent_reloader():
+    load_model()
+    return IntentReloader()
+
+if SERVER_URL is None:
+    get_intent_reloader()
+
+# Function to answer a message locally or through the inference server
+def get_response(input_text):
+    if SERVER_URL:
+        return chatbot_remote(SERVER_URL, input_text)
+    return chatbot(input_text)
+
+HISTORY_PAGE_SIZE = 20
+
+# One history store and background log writer per process, shared by every session
+@st.cache_resource
+def get_chat_log_writer():
+    return ChatLogWriter(history_store=get_history_store())
+
+history_store = get_history_store()
+chat_log_writer = get_chat_log_writer()
+
+# Metrics endpoint/file and slow-request profiler, as configured by NEBULA_METRICS_PORT,
+# NEBULA_METRICS_FILE and NEBULA_PROFILE_SLOW_MS (see telemetry.py)
+start_exporters()
+
 counter = 0
 
-# ---------------------- THEME TOGGLE ----------------------
-
-# Initialize session state for themes
-if "themes" not in st.session_state:
-    st.session_state.themes = {
-        "current_theme": "light",
-        "refreshed": True,
-        "light": {
-            "theme.base": "dark",
-            "theme.backgroundColor": "black",
-            "theme.primaryColor": "#57B4BA",  # Kept for consistency, but not used for user bubble
-            "theme.secondaryBackgroundColor": "#092635",
-            "theme.textColor": "white",
-            "button_face": "🌜"
-        },
-        "dark": {
-            "theme.base": "light",
-            "theme.backgroundColor": "white",
-            "theme.primaryColor": "#57B4BA",  # Kept for consistency, but not used for user bubble
-            "theme.secondaryBackgroundColor": "#F0EBE3",
-            "theme.textColor": "#0a1464",
-            "button_face": "🌞"
-        }
-    }
-
-# Function to change theme
-def change_theme():
-    previous_theme = st.session_state.themes["current_theme"]
-    tdict = st.session_state.themes["light"] if previous_theme == "light" else st.session_state.themes["dark"]
-    
-    for vkey, vval in tdict.items():
-        if vkey.startswith("theme"):
-            st._config.set_option(vkey, vval)
-    
-    st.session_state.themes["refreshed"] = False
-    st.session_state.themes["current_theme"] = "dark" if previous_theme == "light" else "light"
-
-# Apply initial theme
-if st.session_state.themes["refreshed"]:
-    change_theme()
-
-# Custom CSS to style the interface with WhatsApp-like chat bubbles
-st.markdown("""
-    <style>
-    /* Style the input form */
-    .stForm {
-        padding: 0;
-        margin: 0;
-        background-color: transparent;
-    }
-    
-    .stTextInput > div > div > input {
-        border: none;
-        border-radius: 10px;
-        padding: 8px 12px;
-        background-color: #f0f0f0;
-        color: #333;
-        width: 100%;
-    }
-    
-    .stButton > button {
-        border: none;
-        border-radius: 10px;
-        padding: 8px 12px;
-        background-color: #57B4BA; /* Updated to teal shade */
-        color: white;
-        margin-left: 10px;
-    }
-    
-    .stButton > button:hover {
-        background-color: #468C91; /* Slightly darker teal for hover */
-    }
-    
-    /* WhatsApp-style chat bubbles */
-    .chat-bubble {
-        max-width: 70%;
-        padding: 10px;
-        border-radius: 10px;
-        margin: 5px 0;
-        display: inline-block;
-    }
-    
-    /* Dynamic placeholder color based on theme */
-    [data-baseweb="input"] input::placeholder {
-        color: #888; /* Default for light mode */
-    }
-    
-    body[theme-mode="dark"] [data-baseweb="input"] input::placeholder {
-        color: #ccc; /* Lighter gray for dark mode */
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Shared theme state and chat CSS (see ui_theme.py)
+init_theme()
 
 def main():
     global counter
     
-    # Sidebar Navigation
+    # Sidebar Navigation (every page runs in this process and session)
     st.sidebar.header("Navigation")
     page = st.sidebar.radio("Select a Page", ["Home", "Conversation History", "About", "PDF Chatbot"])
-
-    # Redirect to `pdfchat.py` when selected
-    if page == "PDF Chatbot":
-        os.system("streamlit run pdfchat.py")  # Launch PDF chat
-        st.stop()
+    previous_page = st.session_state.get("current_page")
+    st.session_state.current_page = page
 
     # Theme Toggle Button
-    current_theme = st.session_state.themes["current_theme"]
-    if st.sidebar.button(
-        st.session_state.themes[current_theme]["button_face"] + " Toggle Theme",
-        key="theme_toggle"
-    ):
-        change_theme()
-        st.rerun()
+    theme_toggle()
 
     # Sidebar - Chatbot Details
     st.sidebar.header("📌 Chatbot Info")
     st.sidebar.text("🤖 Name: Nebula-AI")
     st.sidebar.text("👨‍💻 Developer: Shubham Gupta")
+    if page == "PDF Chatbot":
+        st.sidebar.text("📜 Purpose: Context-Aware PDF Chatbot using N-Grams")
+        pdf_chat_page(remounted=previous_page != page)
+        return
     st.sidebar.text("📜 Purpose: AI-Powered Chatbot for Communication")
 
     # Title
     st.markdown("<h2 style='text-align: center;'>🌌 Nebula - AI Chatbot</h2>", unsafe_allow_html=True)
 
-    # Get current theme colors (user bubble color hardcoded to #57B4BA)
-    user_bubble_color = "#57B4BA"  # Explicitly set to teal shade
-    bot_bubble_color = st.session_state.themes[current_theme]["theme.secondaryBackgroundColor"]
-    text_color = st.session_state.themes[current_theme]["theme.textColor"]
-
     # Home Menu - WhatsApp-style Chat
     if page == "Home":
         st.write("Welcome to the chatbot. Please type a message and press Enter to start the conversation.")
 
-        # Check if the chat_log.csv file exists, and if not, create it with column names
-        if not os.path.exists('chat_log.csv'):
-            with open('chat_log.csv', 'w', newline='', encoding='utf-8') as csvfile:
-                csv_writer = csv.writer(csvfile)
-                csv_writer.writerow(['User Input', 'Chatbot Response', 'Timestamp'])
-
-        # Display chat history in WhatsApp style
-        if "chat_history" not in st.session_state:
-            st.session_state.chat_history = []
-
-        for sender, message in st.session_state.chat_history:
-            if sender == "Nebula":
-                st.markdown(
-                    f"""
-                    <div style='display: flex; align-items: center;'>
-                        <img src='https://img.icons8.com/fluency/48/000000/chatbot.png' width='40' height='40' style='margin-right:10px;'>
-                        <div class='chat-bubble' style='background-color: {bot_bubble_color}; color: {text_color};'>
-                            <b>Nebula:</b> {message}
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-            else:
-                st.markdown(
-                    f"""
-                    <div style='display: flex; align-items: center; justify-content: flex-end;'>
-                        <div class='chat-bubble' style='background-color: {user_bubble_color}; color: {text_color};'>
-                            <b>You:</b> {message}
-                        </div>
-                        <img src='https://img.icons8.com/fluency/48/000000/user-male-circle.png' width='40' height='40' style='margin-left:10px;'>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+        # Display the newest turns in WhatsApp style (older ones are paged in on demand)
+        transcript = get_transcript("chat")
+        render_transcript(transcript, history_store)
 
         counter += 1
         
@@ -239,17 +108,16 @@ def main():
             # Convert the user input to a string
             user_input_str = str(user_input)
 
-            response = chatbot(user_input)
-            st.session_state.chat_history.append(("You", user_input_str))
-            st.session_state.chat_history.append(("Nebula", response))
+            with request("chat"):
+                response = get_response(user_input)
+            append_turn(transcript, "You", user_input_str, history_store)
+            append_turn(transcript, "Nebula", response, history_store)
 
             # Get the current timestamp
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            # Save the user input and chatbot response to the chat_log.csv file
-            with open('chat_log.csv', 'a', newline='', encoding='utf-8') as csvfile:
-                csv_writer = csv.writer(csvfile)
-                csv_writer.writerow([user_input_str, response, timestamp])
+            # Queue the user input and chatbot response for the background chat_log.csv writer
+            chat_log_writer.log(user_input_str, response, timestamp)
 
             if response.lower() in ['goodbye', 'bye']:
                 st.write("Thank you for chatting with me. Have a great day!")
@@ -259,14 +127,50 @@ def main():
     # Conversation History Menu
     elif page == "Conversation History":
         st.header("Conversation History")
-        with open('chat_log.csv', 'r', encoding='utf-8') as csvfile:
-            csv_reader = csv.reader(csvfile)
-            next(csv_reader)  # Skip the header row
-            for row in csv_reader:
-                st.text(f"User: {row[0]}")
-                st.text(f"Chatbot: {row[1]}")
-                st.text(f"Timestamp: {row[2]}")
-                st.markdown("---")
+        # Make sure rows queued by this process are stored before reading
+        chat_log_writer.flush()
+
+        filter_cols = st.columns([2, 1, 1])
+        with filter_cols[0]:
+            search = st.text_input("Search", placeholder="Find text in messages or responses")
+        with filter_cols[1]:
+            start_date = st.date_input("From", value=None)
+        with filter_cols[2]:
+            end_date = st.date_input("To", value=None)
+
+        # Start again from the newest page whenever the filters change
+        filters = (search, start_date, end_date)
+        if st.session_state.get("history_filters") != filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_cursors = [None]
+
+        rows, next_cursor = history_store.page(
+            limit=HISTORY_PAGE_SIZE,
+            before=st.session_state.history_cursors[-1],
+            start=f"{start_date} 00:00:00" if start_date else None,
+            end=f"{end_date} 23:59:59" if end_date else None,
+            search=search or None
+        )
+
+        if not rows:
+            st.write("No conversations found.")
+        for _, user_text, bot_text, timestamp in rows:
+            st.text(f"User: {user_text}")
+            st.text(f"Chatbot: {bot_text}")
+            st.text(f"Timestamp: {timestamp}")
+            st.markdown("---")
+
+        nav_cols = st.columns([1, 1, 4])
+        with nav_cols[0]:
+            if st.button("← Newer", disabled=len(st.session_state.history_cursors) == 1):
+                st.session_state.history_cursors.pop()
+                st.rerun()
+        with nav_cols[1]:
+            if st.button("Older →", disabled=next_cursor is None):
+                st.session_state.history_cursors.append(next_cursor)
+                st.rerun()
+        with nav_cols[2]:
+            st.caption(f"Page {len(st.session_state.history_cursors)}")
 
     elif page == "About":
         st.write("The goal of this project is to create a chatbot that can understand and respond to user input based on intents. The chatbot is built using Natural Language Processing (NLP) library and Logistic Regression, to extract the intents and entities from user input. The chatbot is built using Streamlit, a Python library for building interactive web applications.")
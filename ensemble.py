@@ -0,0 +1,189 @@
+import os
+import time
+import random
+import argparse
+import numpy as np
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import SVC
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from intent_model import (
+    INTENTS_PATH, FALLBACK_RESPONSE, load_model, current_model, read_or_build_model, intents_hash,
+    read_intents, hash_intents, parse_training_data, write_artifact, read_artifact, resolve_fast_paths, record_paths,
+)
+from telemetry import span
+
+# Confidence-aware cascade over the classifier families from ChatbotClassifers.ipynb.
+#
+# The pickles the notebook writes to models/ were fit on its 11-intent sample with integer
+# labels and their own vectorizer, so they cannot answer intents.json. The same model
+# families are trained here on the serving vectorizer instead and kept in one versioned
+# artifact, rebuilt whenever intents.json changes (like the intent model itself).
+#
+# A cascade is a list of (model_name, threshold) stages, cheapest first. Every message is
+# scored by the first stage; only the ones whose lift is below that stage's threshold are
+# passed on to the next. The lift is the top probability times the number of classes, i.e.
+# how many times likelier the best tag is than a uniform guess: with a few hundred intents
+# top probabilities sit around 0.01, so an absolute probability threshold would escalate
+# nearly everything, while a lift of 2 means the same at any number of intents. Messages
+# that reach the last stage with a lift below `fallback_threshold` there get
+# FALLBACK_RESPONSE instead of a guess.
+
+# Bump whenever the layout of the cascade artifact changes
+CASCADE_VERSION = 1
+
+CASCADE_ARTIFACT_PATH = os.path.abspath(os.path.join("models", "cascade_models.pkl"))
+
+# Same model settings as the notebook
+MODEL_FACTORIES = {
+    "nb": lambda: MultinomialNB(),
+    "svm": lambda: SVC(kernel='linear', probability=True),
+    "rf": lambda: RandomForestClassifier(n_estimators=100, random_state=42),
+    "logistic": lambda: LogisticRegression(random_state=0, max_iter=10000),
+}
+
+# Keeps about 74% of held-out messages on the logistic stage (see benchmarks/bench_cascade.py)
+DEFAULT_CASCADE = "logistic:2,rf"
+# Same bar as the default stage gate: fall back when the best tag is not twice as likely as a uniform guess
+DEFAULT_FALLBACK_THRESHOLD = 2.0
+
+# The cascade models loaded by this process
+_models = None
+
+# Function to fit the named model families on an already vectorized training set
+def train_cascade_models(x, tags, names=tuple(MODEL_FACTORIES)):
+    models = {}
+    for name in names:
+        models[name] = MODEL_FACTORIES[name]().fit(x, tags)
+    return models
+
+# Function to train every model family on intents.json and write the cascade artifact
+def build_cascade_models(intents_path=INTENTS_PATH, artifact_path=CASCADE_ARTIFACT_PATH, model=None):
+    if model is None:
+        model = load_model(intents_path)
+    data = read_intents(intents_path)
+    if hash_intents(data) != model["intents_hash"]:
+        # Edited since the intent model was built; the reloader retries on the next change check
+        raise ValueError("intents.json changed while the cascade models were being built")
+    _, patterns, tags = parse_training_data(data)
+    x = model["vectorizer"].transform(patterns)
+    # The serving model already is the logistic regression stage
+    models = train_cascade_models(x, tags, [name for name in MODEL_FACTORIES if name != "logistic"])
+    models["logistic"] = model["clf"]
+    for name, clf in models.items():
+        # Stages share class indices with the serving model's response table
+        if tuple(str(tag) for tag in clf.classes_) != model["class_tags"]:
+            raise ValueError(f"{name} classes do not match the intent model")
+
+    artifact = {
+        "version": CASCADE_VERSION,
+        "intents_hash": model["intents_hash"],
+        "models": models,
+    }
+    write_artifact(artifact, artifact_path)
+    return artifact
+
+# Function to load the cascade models once per process, retraining only if intents.json changed
+def load_cascade_models(intents_path=INTENTS_PATH, artifact_path=CASCADE_ARTIFACT_PATH):
+    global _models
+    current_hash = intents_hash(intents_path)
+    if _models is not None and _models["intents_hash"] == current_hash:
+        return _models
+
+    artifact = read_artifact(artifact_path, expected_hash=current_hash, version=CASCADE_VERSION)
+    if artifact is None:
+        artifact = build_cascade_models(intents_path, artifact_path)
+    _models = artifact
+    return _models
+
+# Function to build the serving model for cascade mode: the intent model with its cascade models
+# attached under "cascade", so that a hot reload (intent_reloader.py) swaps both in one step
+def read_or_build_cascade_model(intents_path=INTENTS_PATH, artifact_path=CASCADE_ARTIFACT_PATH):
+    model = read_or_build_model(intents_path)
+    artifact = read_artifact(artifact_path, expected_hash=model["intents_hash"], version=CASCADE_VERSION)
+    if artifact is None:
+        artifact = build_cascade_models(intents_path, artifact_path, model=model)
+    return dict(model, cascade=artifact["models"])
+
+# Function to parse "nb:2,logistic:2,rf" into [(name, lift threshold)]; the last stage needs no threshold
+def parse_cascade(spec):
+    stages = []
+    for part in spec.split(","):
+        name, _, threshold = part.strip().partition(":")
+        if name not in MODEL_FACTORIES:
+            raise ValueError(f"unknown model {name!r} (expected one of {', '.join(MODEL_FACTORIES)})")
+        stages.append((name, float(threshold) if threshold else 0.0))
+    return stages
+
+# Function to run a vectorized batch through the cascade.
+# Returns (class indices, confidences, index of the stage that answered each row).
+def cascade_predict(x, stages, models):
+    n = x.shape[0]
+    best = np.zeros(n, dtype=np.intp)
+    confidences = np.zeros(n)
+    answered_by = np.zeros(n, dtype=np.intp)
+    pending = np.arange(n)
+    for i, (name, threshold) in enumerate(stages):
+        probabilities = models[name].predict_proba(x[pending])
+        stage_best = probabilities.argmax(axis=1)
+        stage_confidence = probabilities[np.arange(len(pending)), stage_best]
+        best[pending] = stage_best
+        confidences[pending] = stage_confidence
+        answered_by[pending] = i
+        pending = pending[stage_confidence * probabilities.shape[1] < threshold]
+        if not len(pending):
+            break
+    return best, confidences, answered_by
+
+# Function to mark which rows get an answer: accepted by an earlier stage, or with enough lift at the last
+def answered_mask(confidences, answered_by, stages, fallback_threshold, n_classes):
+    return (answered_by < len(stages) - 1) | (confidences * n_classes >= fallback_threshold)
+
+# Function to classify many messages through the cascade, returning [(tag, confidence, response, path)].
+# Patterns matched by the intent model's pattern matcher skip the cascade; path is then "exact"
+# or "fuzzy", otherwise the name of the answering stage. Unanswered messages come back as
+# (None, confidence, FALLBACK_RESPONSE, "fallback").
+def cascade_classify_batch(texts, stages=None, fallback_threshold=DEFAULT_FALLBACK_THRESHOLD,
+                           model=None, models=None):
+    if model is None:
+        model = current_model()
+    if models is None:
+        models = model.get("cascade") or load_cascade_models()["models"]
+    if stages is None:
+        stages = parse_cascade(DEFAULT_CASCADE)
+    if not texts:
+        return []
+    # The shared response cache holds the single model's results, so it is not consulted here
+    with span("fast_path"):
+        _, found, paths = resolve_fast_paths(texts, model, cache=None)
+    pending = [i for i, value in enumerate(found) if value is None]
+    if pending:
+        with span("vectorize"):
+            x = model["vectorizer"].transform([texts[i] for i in pending])
+        with span("predict"):
+            best, confidences, answered_by = cascade_predict(x, stages, models)
+        answered = answered_mask(confidences, answered_by, stages, fallback_threshold, len(model["class_tags"]))
+        for i, idx, confidence, stage, ok in zip(pending, best.tolist(), confidences.tolist(),
+                                                  answered_by.tolist(), answered.tolist()):
+            found[i] = (idx if ok else None, confidence)
+            paths[i] = stages[stage][0] if ok else "fallback"
+    record_paths(paths)
+
+    with span("response_lookup"):
+        results = []
+        for (idx, confidence), path in zip(found, paths):
+            if idx is None:
+                results.append((None, confidence, FALLBACK_RESPONSE, path))
+            else:
+                results.append((model["class_tags"][idx], confidence, random.choice(model["class_responses"][idx]), path))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the cascade models on intents.json.")
+    parser.add_argument("--intents", default=INTENTS_PATH)
+    parser.add_argument("--output", default=CASCADE_ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    artifact = build_cascade_models(args.intents, args.output)
+    print(f"Built {args.output} ({', '.join(artifact['models'])}) in {time.perf_counter() - start:.2f}s")
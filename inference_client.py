@@ -0,0 +1,19 @@
+import json
+import urllib.request
+
+# Thin client for inference_server.py, so UIs don't need to load the model themselves
+
+# Function to ask the inference server for a full {tag, confidence, response, path} result
+def classify_remote(server_url, message, timeout=10):
+    request = urllib.request.Request(
+        server_url.rstrip("/") + "/chat",
+        data=json.dumps({"message": message}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as reply:
+        return json.loads(reply.read())
+
+# Function to get just the response text, mirroring intent_model.chatbot()
+def chatbot_remote(server_url, message, timeout=10):
+    return classify_remote(server_url, message, timeout)["response"]
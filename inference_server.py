@@ -0,0 +1,209 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import functools
+from intent_model import load_model, current_model, swap_model, read_or_build_model, response_cache, path_stats
+from intent_reloader import IntentReloader
+from micro_batcher import MicroBatcher
+from telemetry import start_exporters, observe_request, render_prometheus
+
+# Headless inference service for the intent bot.
+#
+#   POST /chat     {"message": "..."} -> {"tag": ..., "confidence": ..., "response": ..., "path": ...}
+#   GET  /healthz  -> {"status": "ok", "intents_hash": ..., "cache": {"hits": ..., ...}, "paths": {...},
+#                      "reload": {"reloads": ..., "last_duration_s": ..., ...}}
+#   GET  /metrics  -> per-stage and per-request latency histograms, Prometheus text format
+#
+# "path" says what resolved the message: "exact" or "fuzzy" (pattern matcher), "cache" or
+# "model" (or a cascade stage / "fallback" with --cascade); /healthz counts requests per path.
+# Edits to intents.json are picked up without a restart (see intent_reloader.py).
+#
+# Or with --stdin: one {"message": "..."} JSON object per line in, one result per line out.
+
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+# The intents.json watcher, when enabled
+reloader = None
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Function to classify one message through the shared micro-batcher
+async def answer(batcher, message):
+    start = time.perf_counter()
+    tag, confidence, response, path = await asyncio.wrap_future(batcher.submit(message))
+    observe_request("chat", time.perf_counter() - start)
+    return {"tag": tag, "confidence": confidence, "response": response, "path": path}
+
+# Function to write an HTTP response: JSON, or plain text when the payload is a string
+async def send_json(writer, status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+# Function to read one HTTP request, returning (method, path, headers, body) or None on EOF
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split(" ")
+    if len(parts) != 3:
+        raise RequestError(400, "malformed request line")
+    method, path, _ = parts
+    path = path.split("?", 1)[0]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, "payload too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+# Function to dispatch one parsed request
+async def route(batcher, method, path, body):
+    if path == "/healthz":
+        return 200, {"status": "ok", "intents_hash": current_model()["intents_hash"], "cache": response_cache.stats(),
+                     "paths": path_stats(), "reload": reloader.stats() if reloader else None}
+    if path == "/metrics":
+        return 200, render_prometheus()
+    if path != "/chat":
+        return 404, {"error": "not found"}
+    if method != "POST":
+        return 405, {"error": "use POST"}
+    try:
+        message = json.loads(body)["message"]
+    except (ValueError, KeyError, TypeError):
+        return 400, {"error": "expected JSON body with a 'message' field"}
+    if not isinstance(message, str):
+        return 400, {"error": "'message' must be a string"}
+    return 200, await answer(batcher, message)
+
+async def handle_connection(batcher, reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except RequestError as exc:
+                await send_json(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                status, payload = await route(batcher, method, path, body)
+            except Exception as exc:
+                status, payload = 500, {"error": str(exc)}
+            await send_json(writer, status, payload, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve_http(host, port, batcher):
+    server = await asyncio.start_server(lambda r, w: handle_connection(batcher, r, w), host, port)
+    print(f"Nebula inference server listening on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+# Function to serve JSONL over stdin/stdout (answers may be written out of order; each carries its id)
+async def serve_stdin(batcher):
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def answer_line(line):
+        try:
+            request = json.loads(line)
+            message = request["message"]
+            if not isinstance(message, str):
+                result = {"error": "'message' must be a string", "id": request.get("id")}
+            else:
+                result = await answer(batcher, message)
+                result["id"] = request.get("id")
+        except (ValueError, KeyError, TypeError) as exc:
+            result = {"error": str(exc)}
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        if line.strip():
+            task = asyncio.ensure_future(answer_line(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Nebula intent inference server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--stdin", action="store_true", help="serve JSONL on stdin/stdout instead of HTTP")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--cascade", nargs="?", const="default", default=None,
+                        help="answer through a model cascade, e.g. 'logistic:2,rf' (see ensemble.py)")
+    parser.add_argument("--fallback-threshold", type=float, default=None,
+                        help="last-stage lift (top probability x number of intents) below which the cascade "
+                             "returns the fallback response (default 2)")
+    parser.add_argument("--reload-interval", type=float, default=2.0,
+                        help="seconds between checks of intents.json for changes (0 disables hot reload)")
+    args = parser.parse_args()
+
+    # Load the model(s) once, before accepting traffic
+    build = read_or_build_model
+    batcher_options = {}
+    if args.cascade is None:
+        load_model()
+    else:
+        from ensemble import (DEFAULT_CASCADE, DEFAULT_FALLBACK_THRESHOLD, read_or_build_cascade_model,
+                              parse_cascade, cascade_classify_batch)
+        stages = parse_cascade(DEFAULT_CASCADE if args.cascade == "default" else args.cascade)
+        # The cascade models travel with the intent model so a reload swaps them together
+        build = read_or_build_cascade_model
+        swap_model(build())
+        batcher_options["classify"] = functools.partial(
+            cascade_classify_batch, stages=stages,
+            fallback_threshold=DEFAULT_FALLBACK_THRESHOLD if args.fallback_threshold is None else args.fallback_threshold,
+        )
+    batcher = MicroBatcher(max_batch_size=args.max_batch, max_wait=args.max_wait_ms / 1000, **batcher_options)
+    if args.reload_interval > 0:
+        reloader = IntentReloader(interval=args.reload_interval, build=build)
+    start_exporters()
+    try:
+        if args.stdin:
+            asyncio.run(serve_stdin(batcher))
+        else:
+            asyncio.run(serve_http(args.host, args.port, batcher))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if reloader is not None:
+            reloader.close()
+        batcher.close()
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import random
+import pickle
+import hashlib
+import threading
+import argparse
+from collections import Counter
+import numpy as np
+from response_cache import ResponseCache, normalize_text, normalization_mode
+from pattern_matcher import PatternMatcher
+from telemetry import span
+
+# Bump whenever the layout of the compiled artifact changes
+ARTIFACT_VERSION = 4
+
+INTENTS_PATH = os.path.abspath("intents.json")
+ARTIFACT_PATH = os.path.abspath(os.path.join("models", "intent_model.pkl"))
+
+# Returned when the predicted class has no responses
+FALLBACK_RESPONSE = "Sorry, I didn't understand that. Could you rephrase?"
+
+# The model loaded by this process (one per worker)
+_model = None
+
+# Classifier results for repeated messages, shared by every caller in this process
+response_cache = ResponseCache()
+
+# Requests served per path, see classify_batch()
+path_counts = Counter()
+_path_lock = threading.Lock()
+
+# Function to read the raw bytes of the intents file. A model is trained on and labelled with
+# the hash of the same bytes, so an edit in between cannot pair old intents with a new hash.
+def read_intents(intents_path=INTENTS_PATH):
+    with open(intents_path, "rb") as file:
+        return file.read()
+
+def hash_intents(data):
+    return hashlib.sha256(data).hexdigest()
+
+# Function to hash the raw bytes of the intents file
+def intents_hash(intents_path=INTENTS_PATH):
+    return hash_intents(read_intents(intents_path))
+
+# Function to parse the bytes of intents.json as (intents, patterns, tags) training data
+def parse_training_data(data):
+    intents = json.loads(data)
+
+    tags = []
+    patterns = []
+    for intent in intents:
+        for pattern in intent['patterns']:
+            tags.append(intent['tag'])
+            patterns.append(pattern)
+    return intents, patterns, tags
+
+# Function to read intents.json as (intents, patterns, tags) training data
+def load_training_data(intents_path=INTENTS_PATH):
+    return parse_training_data(read_intents(intents_path))
+
+# Function to train the vectorizer and classifier on intents.json (or on its already read bytes)
+def train_model(intents_path=INTENTS_PATH, data=None):
+    # Only needed to retrain (unpickling the artifact imports what it uses)
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    if data is None:
+        data = read_intents(intents_path)
+    intents, patterns, tags = parse_training_data(data)
+
+    vectorizer = TfidfVectorizer()
+    clf = LogisticRegression(random_state=0, max_iter=10000)
+    x = vectorizer.fit_transform(patterns)
+    clf.fit(x, tags)
+
+    # Tag -> responses table (later intents with the same tag extend it)
+    responses = {}
+    for intent in intents:
+        responses.setdefault(intent['tag'], []).extend(intent['responses'])
+
+    class_tags, class_responses = build_index(clf, responses)
+    class_ids = {tag: idx for idx, tag in enumerate(class_tags)}
+    matcher = PatternMatcher(patterns, [class_ids[tag] for tag in tags])
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "intents_hash": hash_intents(data),
+        "vectorizer": vectorizer,
+        "clf": clf,
+        "responses": {tag: tuple(r) for tag, r in responses.items()},
+        "class_tags": class_tags,
+        "class_responses": class_responses,
+        "matcher": matcher,
+        # The matcher's keys only match messages normalized the same way
+        "normalization": normalization_mode(),
+    }
+
+# Function to build the class-index -> tag / responses arrays aligned with clf.classes_
+def build_index(clf, responses):
+    class_tags = tuple(str(tag) for tag in clf.classes_)
+    class_responses = tuple(tuple(responses.get(tag) or (FALLBACK_RESPONSE,)) for tag in class_tags)
+    return class_tags, class_responses
+
+# Function to pickle an artifact atomically
+def write_artifact(artifact, artifact_path):
+    os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+    # Write to a temp file first so a concurrent loader never sees a partial pickle
+    tmp_path = artifact_path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, artifact_path)
+
+# Function to compile intents.json into a single versioned artifact
+def build_model(intents_path=INTENTS_PATH, artifact_path=ARTIFACT_PATH, data=None):
+    model = train_model(intents_path, data)
+    write_artifact(model, artifact_path)
+    return model
+
+# Function to read an artifact, returning None if it is missing, from another version or stale
+# (built from other intents, or with patterns normalized differently than this process would)
+def read_artifact(artifact_path=ARTIFACT_PATH, expected_hash=None, version=ARTIFACT_VERSION):
+    if not os.path.exists(artifact_path):
+        return None
+    try:
+        with open(artifact_path, "rb") as f:
+            model = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(model, dict) or model.get("version") != version:
+        return None
+    if expected_hash is not None and model.get("intents_hash") != expected_hash:
+        return None
+    if "normalization" in model and model["normalization"] != normalization_mode():
+        return None
+    return model
+
+# Function to get the compiled model for intents.json, training (and writing) it if the artifact is stale
+def read_or_build_model(intents_path=INTENTS_PATH, artifact_path=ARTIFACT_PATH):
+    data = read_intents(intents_path)
+    model = read_artifact(artifact_path, expected_hash=hash_intents(data))
+    if model is None:
+        model = build_model(intents_path, artifact_path, data)
+    return model
+
+# Function to load the model once per process, retraining only if intents.json changed
+def load_model(intents_path=INTENTS_PATH, artifact_path=ARTIFACT_PATH):
+    global _model
+    current_hash = intents_hash(intents_path)
+    if _model is not None and _model["intents_hash"] == current_hash:
+        return _model
+
+    _model = read_or_build_model(intents_path, artifact_path)
+    return _model
+
+# Function to get the model this process is serving, loading it on first use
+def current_model():
+    model = _model
+    return model if model is not None else load_model()
+
+# Function to install a new model for every later request, returning the previous one.
+# Callers read the model once per batch, so batches already running finish on the old one.
+def swap_model(model):
+    global _model
+    previous, _model = _model, model
+    return previous
+
+# Function to answer a message with the loaded model
+def chatbot(input_text, model=None, cache=response_cache):
+    return classify_batch([input_text], model, cache)[0][2]
+
+# Function to get the version a cached classification is only valid for
+def model_version(model):
+    return model["version"], model["intents_hash"]
+
+# Function to count which path served each request (exact, fuzzy, cache, model, ...)
+def record_paths(paths):
+    with _path_lock:
+        path_counts.update(paths)
+
+def path_stats():
+    with _path_lock:
+        total = sum(path_counts.values())
+        return {path: {"requests": count, "share": count / total} for path, count in path_counts.items()}
+
+# Function to resolve messages from the pattern matcher first, then the cache.
+# Returns (keys, found, paths): the normalized messages, (class index, confidence) or None
+# for each, and the path that resolved it (None where the classifier is still needed).
+def resolve_fast_paths(texts, model, cache=response_cache):
+    matcher = model["matcher"]
+    keys = [normalize_text(text) for text in texts]
+    found = [None] * len(texts)
+    paths = [None] * len(texts)
+    for i, key in enumerate(keys):
+        cls = matcher.exact.get(key)
+        if cls is not None:
+            found[i], paths[i] = (cls, 1.0), "exact"
+
+    pending = [i for i, value in enumerate(found) if value is None]
+    if cache is not None and pending:
+        for i, value in zip(pending, cache.get_many([keys[i] for i in pending], model_version(model))):
+            if value is not None:
+                found[i], paths[i] = value, "cache"
+
+    near = {}
+    for i, value in enumerate(found):
+        if value is None:
+            if keys[i] not in near:
+                near[keys[i]] = matcher.match(keys[i])
+            if near[keys[i]] is not None:
+                cls, confidence, paths[i] = near[keys[i]]
+                found[i] = (cls, confidence)
+    if cache is not None:
+        cache.put_many({key: match[:2] for key, match in near.items() if match is not None}, model_version(model))
+    return keys, found, paths
+
+# Function to classify many messages, returning [(tag, confidence, response, path)].
+# Verbatim and near-verbatim patterns are resolved by the pattern matcher, repeated messages
+# by the cache, and everything else with one sparse transform and one predict_proba call.
+def classify_batch(texts, model=None, cache=response_cache):
+    if model is None:
+        model = current_model()
+    if not texts:
+        return []
+    with span("fast_path"):
+        keys, found, paths = resolve_fast_paths(texts, model, cache)
+
+    # Classify each distinct missing key once, using the first message that produced it
+    missing = {}
+    for text, key, value in zip(texts, keys, found):
+        if value is None and key not in missing:
+            missing[key] = text
+    if missing:
+        with span("vectorize"):
+            x = model["vectorizer"].transform(list(missing.values()))
+        with span("predict"):
+            probabilities = model["clf"].predict_proba(x)
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(best)), best]
+        computed = dict(zip(missing, zip(best.tolist(), confidences.tolist())))
+        if cache is not None:
+            cache.put_many(computed, model_version(model))
+        found = [computed[key] if value is None else value for key, value in zip(keys, found)]
+        paths = ["model" if path is None else path for path in paths]
+    record_paths(paths)
+
+    with span("response_lookup"):
+        results = []
+        for (idx, confidence), path in zip(found, paths):
+            results.append((model["class_tags"][idx], confidence, random.choice(model["class_responses"][idx]), path))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile intents.json into the serving artifact.")
+    parser.add_argument("--intents", default=INTENTS_PATH)
+    parser.add_argument("--output", default=ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = build_model(args.intents, args.output)
+    print(f"Built {args.output} ({len(model['responses'])} tags, "
+          f"intents sha256 {model['intents_hash'][:12]}) in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,93 @@
+import os
+import time
+import datetime
+import threading
+from intent_model import INTENTS_PATH, intents_hash, read_or_build_model, current_model, swap_model
+
+# Hot reload of intents.json without restarting the process.
+#
+# A watcher thread polls the intents file's mtime and size every `interval` seconds. When its
+# content hash differs from the serving model's, the new model is built in the watcher thread
+# by `build(intents_path)` (by default read from the artifact if another worker already compiled
+# it, else trained) while requests keep being answered by the current model. A warm-up
+# prediction checks it, then swap_model() installs it with one reference assignment: batches
+# that already started finish on the old model, later ones use the new one, and no request
+# sees a mix of the two. If the file cannot be loaded (e.g. invalid JSON half-way through an
+# edit) the reload is counted as failed and the old model stays in service.
+
+# Durations kept for the reload stats
+MAX_DURATIONS = 100
+
+class IntentReloader:
+    def __init__(self, intents_path=INTENTS_PATH, interval=2.0, build=read_or_build_model):
+        self.intents_path = intents_path
+        self.interval = interval
+        self.build = build
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_reload_at = None
+        self._durations = []
+        self._last_stat = self._stat()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="intent-reloader", daemon=True)
+        self._thread.start()
+
+    # Function to get the intents file's (mtime, size), or None while it is missing
+    def _stat(self):
+        try:
+            stat = os.stat(self.intents_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # Function to reload if the intents file changed since the last check; True if a model was swapped in
+    def check(self):
+        stat = self._stat()
+        if stat is None or stat == self._last_stat:
+            return False
+        self._last_stat = stat
+        return self.reload()
+
+    # Function to build and install the model for the current intents file, unless it is already serving
+    def reload(self):
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                if intents_hash(self.intents_path) == current_model()["intents_hash"]:
+                    return False
+                model = self.build(self.intents_path)
+                # Fail here rather than on the first request if the new model cannot predict
+                model["clf"].predict_proba(model["vectorizer"].transform(["hello"]))
+            except Exception as exc:
+                self.failures += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                return False
+            swap_model(model)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = datetime.datetime.now().isoformat(timespec="seconds")
+            self._durations = (self._durations + [time.perf_counter() - start])[-MAX_DURATIONS:]
+            return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def stats(self):
+        durations = self._durations
+        return {
+            "intents_hash": current_model()["intents_hash"],
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+            "last_duration_s": durations[-1] if durations else None,
+            "mean_duration_s": sum(durations) / len(durations) if durations else None,
+            "max_duration_s": max(durations) if durations else None,
+        }
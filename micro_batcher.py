@@ -0,0 +1,77 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from intent_model import classify_batch
+
+# Coalesces concurrent classify() calls that arrive within a short window
+# into one classify_batch() call, so bursts share a single sparse transform
+# and predict_proba instead of paying the per-call sklearn overhead.
+class MicroBatcher:
+    def __init__(self, max_batch_size=256, max_wait=0.005, classify=classify_batch):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.classify = classify
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    # Queue one message; the returned Future resolves to (tag, confidence, response, path)
+    def submit(self, text):
+        if self._stopped.is_set():
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    # Blocking convenience wrapper around submit()
+    def classify_one(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def close(self):
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    # Function to collect up to max_batch_size requests, waiting at most max_wait after the first
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Leave the shutdown marker for the next _collect() call
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [text for text, _ in batch]
+            try:
+                results = self.classify(texts)
+            except Exception:
+                # Retry one by one, so a bad message only fails its own request
+                self._run_each(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_each(self, batch):
+        for text, future in batch:
+            try:
+                future.set_result(self.classify([text])[0])
+            except Exception as exc:
+                future.set_exception(exc)
@@ -0,0 +1,103 @@
+import os
+import sys
+import argparse
+import warnings
+from functools import lru_cache
+
+# Text helpers shared by both apps, with NLTK resolved offline.
+#
+# Nothing here is downloaded at import time. NLTK data is looked up in the bundled
+# ./nltk_data directory (fill it once with `python nlp_resources.py --download`), then
+# $NLTK_DATA and NLTK's usual locations. Without the punkt models sentences are split by
+# an untrained Punkt tokenizer, and without wordnet words are left unlemmatized.
+# nltk itself is imported on first use only.
+
+NLTK_DATA_DIR = os.path.abspath("nltk_data")
+
+# Resources the apps use: (nltk.data path, downloader package)
+NLTK_RESOURCES = [
+    ("tokenizers/punkt_tab/english/", "punkt_tab"),
+    ("tokenizers/punkt", "punkt"),
+    ("corpora/wordnet", "wordnet"),
+    ("corpora/omw-1.4", "omw-1.4"),
+]
+
+# Keras' default filters for text_to_word_sequence
+WORD_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+_FILTER_TABLE = str.maketrans(WORD_FILTERS, " " * len(WORD_FILTERS))
+
+# Function to split text into words like tensorflow.keras.preprocessing.text.text_to_word_sequence
+# (lowercase, punctuation treated as separators), without importing tensorflow
+def text_to_word_sequence(text, lower=True):
+    if lower:
+        text = text.lower()
+    return text.translate(_FILTER_TABLE).split()
+
+# Function to import nltk with the bundled data directory searched first
+@lru_cache(maxsize=1)
+def get_nltk():
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return nltk
+
+# Function to check whether an NLTK resource is available locally (never downloads)
+def has_nltk_resource(resource):
+    try:
+        get_nltk().data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+# Function to get the sentence tokenizer: trained punkt when installed, otherwise an untrained
+# Punkt tokenizer (same algorithm, no abbreviation list), so sentence splitting works offline
+@lru_cache(maxsize=1)
+def get_sentence_tokenizer():
+    nltk = get_nltk()
+    if has_nltk_resource("tokenizers/punkt_tab/english/") or has_nltk_resource("tokenizers/punkt"):
+        try:
+            nltk.tokenize.sent_tokenize("Warm up.")
+            return nltk.tokenize.sent_tokenize
+        except LookupError:
+            pass
+    warnings.warn("NLTK punkt data not found; using an untrained sentence tokenizer "
+                  "(run `python nlp_resources.py --download` to bundle it)")
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+    return PunktSentenceTokenizer().tokenize
+
+def sent_tokenize(text):
+    return get_sentence_tokenizer()(text)
+
+# Function to get the notebook's WordNet lemmatizer, or None when the wordnet data is not installed
+@lru_cache(maxsize=1)
+def get_lemmatizer():
+    get_nltk()
+    try:
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize("tests")
+        return lemmatizer
+    except (ImportError, LookupError):
+        return None
+
+# Function to download every resource into the bundled directory (run once, e.g. when building an image)
+def download_resources(download_dir=NLTK_DATA_DIR):
+    nltk = get_nltk()
+    ok = True
+    for _, package in NLTK_RESOURCES:
+        ok = nltk.download(package, download_dir=download_dir, quiet=True) and ok
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or bundle the NLTK data used by the apps.")
+    parser.add_argument("--download", action="store_true", help=f"download missing resources into {NLTK_DATA_DIR}")
+    args = parser.parse_args()
+
+    if args.download and not download_resources():
+        print("Some resources could not be downloaded", file=sys.stderr)
+    missing = 0
+    for resource, package in NLTK_RESOURCES:
+        found = has_nltk_resource(resource)
+        missing += not found
+        print(f"{package:>10}: {'found' if found else 'missing'}")
+    sys.exit(1 if missing and args.download else 0)
@@ -0,0 +1,115 @@
+import numpy as np
+from response_cache import normalize_text
+
+# Function to get the character trigrams of a normalized string (padded so short words still count)
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Function to compute the Levenshtein distance, giving up (returning max_distance + 1) once it
+# is exceeded. Only the diagonal band |i - j| <= max_distance can stay within the bound, so
+# cells outside it are never computed.
+def edit_distance(a, b, max_distance):
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    over = max_distance + 1
+    previous = [j if j <= max_distance else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        lo, hi = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= max_distance else over
+        ca = a[i - 1]
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+# Function to find the edit distance up to max_distance, trying narrow bands first
+# (near-verbatim messages are usually one or two edits away)
+def bounded_edit_distance(a, b, max_distance):
+    bound = 1
+    while True:
+        bound = min(bound, max_distance)
+        distance = edit_distance(a, b, bound)
+        if distance <= bound or bound == max_distance:
+            return distance if distance <= bound else max_distance + 1
+        bound *= 2
+
+# Precomputed lookup from intents.json patterns straight to a class index.
+#
+# Exact: a dict from each normalized pattern (see response_cache.normalize_text) to its
+# class. Near: a trigram -> pattern posting index narrows a message down to the patterns
+# sharing most of its trigrams, then the closest one is accepted if it is within a small
+# edit distance. Patterns (or near matches) claimed by more than one class are left to the
+# classifier.
+class PatternMatcher:
+    def __init__(self, patterns, classes, max_edit_ratio=0.15, min_trigram_overlap=0.5, max_candidates=8):
+        self.max_edit_ratio = max_edit_ratio
+        self.min_trigram_overlap = min_trigram_overlap
+        self.max_candidates = max_candidates
+
+        exact = {}
+        for pattern, cls in zip(patterns, classes):
+            key = normalize_text(pattern)
+            if key:
+                exact.setdefault(key, set()).add(cls)
+        self.keys = list(exact)
+        self.key_classes = [owners.pop() if len(owners) == 1 else None for owners in exact.values()]
+        self.exact = {key: cls for key, cls in zip(self.keys, self.key_classes) if cls is not None}
+
+        self.key_trigrams = np.array([len(trigrams(key)) for key in self.keys])
+        postings = {}
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, []).append(key_id)
+        self.postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+    # Function to resolve an already normalized message, returning (class, confidence, path) or None.
+    # path is "exact" or "fuzzy"; confidence is 1.0 for exact and 1 - distance / length for near matches.
+    def match(self, key):
+        cls = self.exact.get(key)
+        if cls is not None:
+            return cls, 1.0, "exact"
+        if not key:
+            return None
+
+        grams = trigrams(key)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return None
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        # Dice coefficient of the trigram sets, best candidates first
+        overlap = 2 * shared / (len(grams) + self.key_trigrams)
+        if len(overlap) > self.max_candidates:
+            candidates = np.argpartition(-overlap, self.max_candidates)[:self.max_candidates]
+            candidates = candidates[np.argsort(-overlap[candidates], kind="stable")]
+        else:
+            candidates = np.argsort(-overlap, kind="stable")
+        best, best_distance, tied = None, None, False
+        for key_id in candidates.tolist():
+            if overlap[key_id] < self.min_trigram_overlap:
+                break
+            candidate = self.keys[key_id]
+            max_distance = int(self.max_edit_ratio * max(len(key), len(candidate)))
+            if max_distance == 0:
+                continue
+            distance = bounded_edit_distance(key, candidate, max_distance if best_distance is None else best_distance)
+            if distance > max_distance:
+                continue
+            if best_distance is None or distance < best_distance:
+                best, best_distance, tied = key_id, distance, False
+            elif distance == best_distance and self.key_classes[key_id] != self.key_classes[best]:
+                tied = True
+        if best is None or tied or self.key_classes[best] is None:
+            return None
+        return self.key_classes[best], 1 - best_distance / max(len(key), len(self.keys[best])), "fuzzy"
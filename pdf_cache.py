@@ -0,0 +1,151 @@
+import os
+import json
+import threading
+import numpy as np
+import scipy.sparse as sp
+from pdf_index import vectorizer_from_vocabulary, vocabulary_terms, compute_sentence_lengths
+
+# Bump whenever the on-disk layout of a cached index changes
+INDEX_FORMAT_VERSION = 3
+
+CACHE_DIR = os.path.abspath("pdf_cache")
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# On-disk store of processed PDF indexes keyed by the PDF's content hash.
+#
+# Each document is two files: <key>.npz holds the CSR arrays of the sentence
+# TF-IDF matrix, the idf weights, the precomputed window norms and each
+# sentence's page number; <key>.json
+# holds the sentences, the vocabulary and the window sizes. Least recently
+# used documents (by mtime, refreshed on every hit) are evicted once the
+# store exceeds max_bytes.
+class PdfIndexCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, pdf_hash):
+        key = f"{pdf_hash}-v{INDEX_FORMAT_VERSION}"
+        return os.path.join(self.cache_dir, key + ".npz"), os.path.join(self.cache_dir, key + ".json")
+
+    # Function to load a cached sentence index (see pdf_index.build_sentence_index), or None
+    def get(self, pdf_hash):
+        npz_path, json_path = self._paths(pdf_hash)
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with np.load(npz_path) as arrays:
+                matrix = sp.csr_matrix(
+                    (arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(arrays["shape"])
+                )
+                idf = arrays["idf"]
+                window_norms = np.split(arrays["window_norms"], np.cumsum(arrays["window_lengths"])[:-1])
+                pages = arrays["pages"].tolist() if meta["has_pages"] else None
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Refresh recency for LRU eviction
+        for path in (npz_path, json_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            self.hits += 1
+        sentence_lengths = compute_sentence_lengths(matrix, idf)
+        return {
+            "vectorizer": vectorizer_from_vocabulary(meta["terms"], idf),
+            "matrix": matrix,
+            "postings": matrix.tocsc(),
+            "window_norms": window_norms,
+            "sentence_lengths": sentence_lengths,
+            "avg_sentence_length": float(sentence_lengths.mean()) if len(sentence_lengths) else 0.0,
+            "sentences": meta["sentences"],
+            "pages": pages,
+            "min_n": meta["min_n"],
+            "max_n": meta["max_n"],
+        }
+
+    # Function to store an index built by pdf_index.build_sentence_index()
+    def put(self, pdf_hash, index):
+        npz_path, json_path = self._paths(pdf_hash)
+        matrix = sp.csr_matrix(index["matrix"])
+        window_norms = index["window_norms"]
+
+        # Write each file to a temp name and rename, so readers never see partial files
+        tmp_npz = npz_path + f".{os.getpid()}.tmp"
+        with open(tmp_npz, "wb") as f:
+            np.savez(
+                f,
+                data=matrix.data,
+                indices=matrix.indices,
+                indptr=matrix.indptr,
+                shape=np.array(matrix.shape),
+                idf=index["vectorizer"].idf_,
+                window_norms=np.concatenate(window_norms) if window_norms else np.zeros(0),
+                window_lengths=np.array([len(norms) for norms in window_norms], dtype=np.int64),
+                pages=np.array(index.get("pages") or [], dtype=np.int32),
+            )
+        os.replace(tmp_npz, npz_path)
+
+        tmp_json = json_path + f".{os.getpid()}.tmp"
+        with open(tmp_json, "w", encoding="utf-8") as f:
+            json.dump({"format": INDEX_FORMAT_VERSION, "sentences": index["sentences"],
+                       "terms": vocabulary_terms(index["vectorizer"]),
+                       "has_pages": index.get("pages") is not None,
+                       "min_n": index["min_n"], "max_n": index["max_n"]}, f)
+        os.replace(tmp_json, json_path)
+
+        self.evict()
+
+    # Function to list cached files as (mtime, size, path), oldest first
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith((".npz", ".json")):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    # Function to delete least recently used documents until the store fits in max_bytes
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            # Remove both halves of the document together
+            stem = os.path.splitext(path)[0]
+            for sibling in (stem + ".json", stem + ".npz"):
+                try:
+                    sibling_size = os.path.getsize(sibling)
+                    os.remove(sibling)
+                    total -= sibling_size
+                except OSError:
+                    pass
+
+    def bytes_on_disk(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "documents": len([e for e in self._entries() if e[2].endswith(".json")]),
+            "bytes_on_disk": self.bytes_on_disk(),
+        }
@@ -0,0 +1,70 @@
+import threading
+from pdf_index import get_analyzer, retrieve_top_k, answer_from_window, NO_ANSWER
+
+# A corpus of many PDFs searched together.
+#
+# Each document keeps its own sentence index (pdf_index.build_sentence_index), so adding or
+# removing a document never refits the others. What the documents share is one corpus-wide
+# vocabulary, term -> ids of the documents containing it, which routes each query to only the
+# documents that can match it. Window scores are cosine similarities, so results from
+# different documents are ranked on the same 0-1 scale.
+
+# Function to create an empty corpus
+def new_corpus():
+    return {"documents": {}, "term_docs": {}, "lock": threading.Lock()}
+
+# Function to add (or replace, e.g. with a more complete partial index) a document
+def add_document(corpus, doc_id, name, index):
+    with corpus["lock"]:
+        _unlink_terms(corpus, doc_id)
+        corpus["documents"][doc_id] = {"name": name, "index": index}
+        for term in index["vectorizer"].vocabulary_:
+            corpus["term_docs"].setdefault(term, set()).add(doc_id)
+
+# Function to remove a document; the other documents are untouched
+def remove_document(corpus, doc_id):
+    with corpus["lock"]:
+        _unlink_terms(corpus, doc_id)
+        corpus["documents"].pop(doc_id, None)
+
+def _unlink_terms(corpus, doc_id):
+    document = corpus["documents"].get(doc_id)
+    if document is None:
+        return
+    for term in document["index"]["vectorizer"].vocabulary_:
+        doc_ids = corpus["term_docs"].get(term)
+        if doc_ids is not None:
+            doc_ids.discard(doc_id)
+            if not doc_ids:
+                del corpus["term_docs"][term]
+
+# Function to find the documents sharing at least one term with the query
+def route_query(corpus, query):
+    with corpus["lock"]:
+        doc_ids = set()
+        for term in set(get_analyzer()(query)):
+            doc_ids.update(corpus["term_docs"].get(term, ()))
+        return [(doc_id, corpus["documents"][doc_id]) for doc_id in doc_ids]
+
+# Function to search every matching document, returning the k best passages overall as
+# (doc_id, name, context, start, end, score), best first
+def search_corpus(query, corpus, k=1, non_overlapping=False):
+    results = []
+    for doc_id, document in route_query(corpus, query):
+        for context, start, end, score in retrieve_top_k(query, document["index"], k, non_overlapping):
+            results.append((doc_id, document["name"], context, start, end, score))
+    results.sort(key=lambda r: (-r[5], r[1], r[3]))
+    return results[:k]
+
+# Function to answer a query from the best passage in the whole corpus, citing document and page
+# (as HTML with the query terms marked when highlight=True)
+def get_corpus_response(query, corpus, highlight=False):
+    best = search_corpus(query, corpus, k=1)
+    if not best:
+        return NO_ANSWER
+    doc_id, name, context, start, end, _ = best[0]
+    document = corpus["documents"].get(doc_id)
+    if document is None:
+        # Removed while we were searching
+        return NO_ANSWER
+    return answer_from_window(query, document["index"], start, end, source=name, highlight=highlight)
@@ -0,0 +1,149 @@
+import io
+import os
+import time
+import tempfile
+import itertools
+import threading
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+from nlp_resources import sent_tokenize
+from telemetry import span, observe_span
+
+# Kept light (no sklearn/Streamlit, nltk imported on use): worker processes import this module on spawn.
+
+PAGES_PER_TASK = 8
+
+# Extraction pool shared by every upload in this process, so workers are spawned once
+_pool = None
+_pool_lock = threading.Lock()
+
+# Parsed readers of the last documents a worker extracted from, by document key, so that
+# consecutive ranges of one PDF do not parse its cross-reference table again
+MAX_CACHED_READERS = 2
+_readers = OrderedDict()
+
+# Numbers the documents this process hands to the pool, so their spool files are never reused
+_document_ids = itertools.count()
+
+# Function to get (creating on first use) the shared extraction pool
+def get_extraction_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the Streamlit server is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+# Function to drop the shared pool after a worker died, so the next caller gets a fresh one
+def reset_extraction_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# Function to count the pages of a PDF
+def count_pdf_pages(pdf_bytes):
+    return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+# Function to write a document to a temporary file for the pool, returning its path. Tasks then
+# carry the path instead of pickling the whole PDF for every page range; it also keys the
+# workers' reader cache.
+def spool_document(pdf_bytes):
+    fd, path = tempfile.mkstemp(prefix=f"nebula-pdf-{os.getpid()}-{next(_document_ids)}-", suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    return path
+
+# Function to delete a spooled document once no more ranges will be extracted from it
+def release_document(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# Function to get a parsed reader for a spooled document, reusing the worker's cached one
+def get_reader(path):
+    reader = _readers.get(path)
+    if reader is None:
+        with open(path, "rb") as f:
+            reader = _readers[path] = PyPDF2.PdfReader(io.BytesIO(f.read()))
+        while len(_readers) > MAX_CACHED_READERS:
+            _readers.popitem(last=False)
+    _readers.move_to_end(path)
+    return reader
+
+# Function to extract text from pages [start, stop) of a spooled document (runs in a worker process)
+def extract_page_range(path, start, stop):
+    pdf_reader = get_reader(path)
+    return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+# Function to extract pages [start, stop) in a worker process, returning (texts, seconds taken),
+# since spans recorded in the worker would not reach this process's metrics
+def timed_extract_page_range(path, start, stop):
+    begin = time.perf_counter()
+    texts = extract_page_range(path, start, stop)
+    return texts, time.perf_counter() - begin
+
+# Function to yield (page_number, text) in page order, extracting page ranges in a process pool.
+# Small documents, single-core machines and workers=0 extract in-process.
+def iter_pdf_pages(pdf_bytes, workers=None, pages_per_task=PAGES_PER_TASK):
+    num_pages = count_pdf_pages(pdf_bytes)
+    ranges = [(start, min(start + pages_per_task, num_pages)) for start in range(0, num_pages, pages_per_task)]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    if workers <= 1 or len(ranges) <= 1:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        for start, stop in ranges:
+            with span("pdf_extract"):
+                texts = [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+        return
+
+    pool = get_extraction_pool(workers)
+    path = spool_document(pdf_bytes)
+    # Keep a bounded number of ranges in flight so memory stays flat on huge files
+    remaining = iter(ranges)
+    pending = deque()
+    try:
+        for start, stop in itertools.islice(remaining, workers * 2):
+            pending.append((start, pool.submit(timed_extract_page_range, path, start, stop)))
+        while pending:
+            start, future = pending.popleft()
+            texts, seconds = future.result()
+            observe_span("pdf_extract", seconds)
+            for next_start, next_stop in itertools.islice(remaining, 1):
+                pending.append((next_start, pool.submit(timed_extract_page_range, path, next_start, next_stop)))
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    finally:
+        # If the consumer stops early, drop the ranges that have not started yet
+        for _, future in pending:
+            future.cancel()
+        release_document(path)
+
+# Function to tokenize pages into sentences as they arrive, yielding (sentence, page_number).
+# The last sentence of each page is held back and joined with the next page, since it may
+# continue there; a sentence is attributed to the page it starts on.
+def iter_page_sentences(pages):
+    carry, carry_page = "", None
+    for page_number, text in pages:
+        first_page = carry_page if carry else page_number
+        with span("tokenize"):
+            sentences = [s.strip() for s in sent_tokenize(carry + "\n" + text) if s.strip()]
+        if not sentences:
+            continue
+        for i, sentence in enumerate(sentences[:-1]):
+            yield sentence, first_page if i == 0 else page_number
+        carry = sentences[-1]
+        carry_page = first_page if len(sentences) == 1 else page_number
+    if carry:
+        yield carry, carry_page
+
+# Function to extract text from PDF
+def extract_text_from_pdf(pdf_file):
+    pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+    return "\n".join(text for _, text in iter_pdf_pages(pdf_bytes))
@@ -0,0 +1,310 @@
+import re
+import html
+import hashlib
+from functools import lru_cache
+import numpy as np
+from pdf_extract import iter_pdf_pages, iter_page_sentences
+from nlp_resources import sent_tokenize
+from telemetry import span
+
+# scikit-learn is imported on first index build, so the app renders before it is loaded
+
+# BM25 parameters for ranking the sentences of a retrieved window
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# The sentence vectorizers' token_pattern, used to find query terms in an answer
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+# Function to get the sentence vectorizers' tokenization (scikit-learn is loaded on first use)
+@lru_cache(maxsize=1)
+def get_analyzer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer().build_analyzer()
+
+# Function to hash an uploaded PDF's bytes (the key for cached indexes)
+def hash_pdf_bytes(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+# Function to preprocess PDF text
+def preprocess_pdf_text(pdf_text):
+    with span("tokenize"):
+        sentences = sent_tokenize(pdf_text)
+    sentences = [s.strip() for s in sentences if s.strip()]  # Remove empty sentences
+    return sentences
+
+# Function to index each sentence once. Rows are un-normalized TF-IDF vectors so that the
+# vector of a window of sentences is just the sum of its rows. `pages` optionally gives
+# the (1-based) page each sentence starts on.
+def build_sentence_index(sentences, min_n=1, max_n=6, pages=None):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(norm=None)
+    with span("tfidf_fit"):
+        matrix = vectorizer.fit_transform(sentences).tocsr()
+        sentence_lengths = compute_sentence_lengths(matrix, vectorizer.idf_)
+    with span("window_norms"):
+        window_norms = compute_window_norms(matrix, min_n, max_n)
+    return {
+        "vectorizer": vectorizer,
+        "matrix": matrix,
+        # Inverted posting lists: column t lists the sentences containing term t
+        "postings": matrix.tocsc(),
+        "window_norms": window_norms,
+        "sentence_lengths": sentence_lengths,
+        "avg_sentence_length": float(sentence_lengths.mean()) if len(sentence_lengths) else 0.0,
+        "sentences": sentences,
+        "pages": pages,
+        "min_n": min_n,
+        "max_n": max_n,
+    }
+
+# Function to index a PDF while it is being extracted. Yields (pages_done, index) each time
+# the number of extracted pages doubles (starting at first_checkpoint) and once at the end,
+# so the document is queryable after its first pages while the total rebuild work stays
+# within about twice a single build.
+def iter_incremental_indexes(pdf_bytes, min_n=1, max_n=6, first_checkpoint=8, workers=None):
+    return iter_page_indexes(iter_pdf_pages(pdf_bytes, workers=workers), min_n, max_n, first_checkpoint)
+
+# Function to index a stream of (page_number, text) in page order, as iter_incremental_indexes does
+def iter_page_indexes(pages, min_n=1, max_n=6, first_checkpoint=8):
+    sentences, sentence_pages = [], []
+    checkpoint = first_checkpoint
+    pages_done = 0
+    indexed = 0
+
+    def page_stream():
+        nonlocal pages_done
+        for page_number, text in pages:
+            pages_done = page_number
+            yield page_number, text
+
+    for sentence, page_number in iter_page_sentences(page_stream()):
+        sentences.append(sentence)
+        sentence_pages.append(page_number)
+        if pages_done >= checkpoint:
+            checkpoint = pages_done * 2
+            indexed = len(sentences)
+            yield pages_done, build_sentence_index(list(sentences), min_n, max_n, list(sentence_pages))
+    if sentences and indexed != len(sentences):
+        yield pages_done, build_sentence_index(sentences, min_n, max_n, sentence_pages)
+
+# Function to describe the pages a window of sentences spans, e.g. "page 3" or "pages 3-4"
+def cite_pages(index, start_idx, end_idx):
+    pages = index.get("pages")
+    if not pages:
+        return ""
+    first, last = pages[start_idx], pages[end_idx]
+    return f"page {first}" if first == last else f"pages {first}-{last}"
+
+# Function to count the tokens of every sentence. Rows hold tf * idf, so term counts are data / idf.
+def compute_sentence_lengths(matrix, idf):
+    counts = matrix.data / idf[matrix.indices]
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    return np.rint(np.bincount(rows, weights=counts, minlength=matrix.shape[0]))
+
+# Function to compute the L2 norm of every window of min_n..max_n consecutive sentences.
+# ||x_i + ... + x_j||^2 expands into dot products of sentences at most max_n - 1 apart,
+# so only those "band" dot products are needed, not the window vectors themselves.
+def compute_window_norms(matrix, min_n, max_n):
+    n_sentences = matrix.shape[0]
+    band = [
+        np.asarray(matrix[:n_sentences - d].multiply(matrix[d:]).sum(axis=1)).ravel()
+        for d in range(min(max_n, n_sentences))
+    ]
+
+    window_norms = []
+    squared = band[0] if band else np.zeros(0)
+    for n in range(1, max_n + 1):
+        count = n_sentences - n + 1
+        if count <= 0:
+            break
+        if n > 1:
+            # Extend each window by its next sentence: add its own square and its cross terms
+            last = n - 1
+            squared = squared[:count] + band[0][last:last + count]
+            for d in range(1, n):
+                squared = squared + 2 * band[d][last - d:last - d + count]
+        if n >= min_n:
+            window_norms.append(np.sqrt(squared))
+    return window_norms
+
+# Function to score only the windows that share a term with the query. Returns one
+# (n, starts, scores) entry per window size. Rows are already TF-IDF weighted, so a window's
+# score is its dot product with the normalized query divided by the precomputed window norm.
+def score_candidate_windows(query, index):
+    query_vec = index["vectorizer"].transform([query])
+    query_norm = np.sqrt(query_vec.multiply(query_vec).sum())
+    if query_norm == 0:
+        return []
+
+    # Walk the posting lists of the query terms only
+    sentence_scores = (index["postings"][:, query_vec.indices] @ (query_vec.data / query_norm)).ravel()
+    rows = np.flatnonzero(sentence_scores)
+    if len(rows) == 0:
+        return []
+
+    n_sentences = len(index["sentences"])
+    # When matches are everywhere (common terms), scoring every window is cheaper than
+    # enumerating candidates
+    dense = len(rows) * index["max_n"] >= n_sentences // 4
+    if dense:
+        prefix = np.concatenate(([0.0], np.cumsum(sentence_scores)))
+    else:
+        prefix = np.concatenate(([0.0], np.cumsum(sentence_scores[rows])))
+
+    scored = []
+    for n, norms in enumerate(index["window_norms"], start=index["min_n"]):
+        if dense:
+            starts = None
+            numerator = prefix[n:] - prefix[:-n]
+        else:
+            # Every window of n sentences that contains at least one matching sentence
+            starts = np.sort(np.clip((rows[:, None] - np.arange(n)).ravel(), 0, n_sentences - n))
+            starts = starts[np.concatenate(([True], starts[1:] != starts[:-1]))]
+            numerator = prefix[np.searchsorted(rows, starts + n)] - prefix[np.searchsorted(rows, starts)]
+            norms = norms[starts]
+        scores = np.zeros(len(numerator))
+        np.divide(numerator, norms, out=scores, where=norms > 0)
+        scored.append((n, np.arange(len(scores)) if starts is None else starts, scores))
+    return scored
+
+# Function to return the k best windows as (context, start, end, score), best first.
+# Ties prefer shorter, then earlier windows. With non_overlapping=True, windows that share
+# a sentence with a better one are skipped so each result is a distinct passage.
+def retrieve_top_k(query, index, k=1, non_overlapping=False):
+    if k <= 0:
+        return []
+
+    # A window of up to max_n sentences overlaps at most this many others
+    pool = k * len(index["window_norms"]) * (2 * index["max_n"] - 1) if non_overlapping else k
+
+    # Top `pool` of each window size via argpartition, then merge the few survivors
+    with span("similarity_search"):
+        scored = score_candidate_windows(query, index)
+    cand_scores, cand_starts, cand_sizes = [], [], []
+    for n, starts, scores in scored:
+        if pool == 1:
+            # argmax keeps the earliest of tied windows
+            top = np.array([np.argmax(scores)])
+        elif pool < len(scores):
+            top = np.argpartition(-scores, pool - 1)[:pool]
+        else:
+            top = np.arange(len(scores))
+        cand_scores.append(scores[top])
+        cand_starts.append(starts[top])
+        cand_sizes.append(np.full(len(top), n))
+    if not cand_scores:
+        return []
+    scores, starts, sizes = np.concatenate(cand_scores), np.concatenate(cand_starts), np.concatenate(cand_sizes)
+    order = np.lexsort((starts, sizes, -scores))
+
+    sentences = index["sentences"]
+    results = []
+    taken = set()
+    for i in order:
+        start, end = int(starts[i]), int(starts[i] + sizes[i] - 1)
+        if non_overlapping:
+            covered = range(start, end + 1)
+            if taken.intersection(covered):
+                continue
+            taken.update(covered)
+        results.append((" ".join(sentences[start:end + 1]), start, end, float(scores[i])))
+        if len(results) == k:
+            break
+    return results
+
+# Function to find the best window as a (context, start, end) tuple
+def retrieve_context(query, index):
+    best = retrieve_top_k(query, index, k=1)
+    if best:
+        return best[0][:3]
+    # Nothing matches the query: fall back to the first window, as cosine + argmax did
+    return index["sentences"][0], 0, 0
+
+NO_ANSWER = "I couldn't find relevant information in the PDF. Please try rephrasing your query."
+
+# Function to get context-aware response
+def get_context_aware_response(query, index, highlight=False):
+    if not index["sentences"]:
+        return NO_ANSWER
+    _, start_idx, end_idx = retrieve_context(query, index)
+    return answer_from_window(query, index, start_idx, end_idx, highlight=highlight)
+
+# Function to map a query to the set of the index's term ids (matrix columns) without running the vectorizer
+def query_term_ids(query, index):
+    vocabulary = index["vectorizer"].vocabulary_
+    return {vocabulary[term] for term in get_analyzer()(query) if term in vocabulary}
+
+# Function to score the sentences start..end against the query terms with BM25, returning one
+# score per sentence. Term counts and idf come from the indexed TF-IDF rows, so no sentence is
+# tokenized again. A window holds at most max_n sentences, few enough that walking their CSR
+# entries in Python is cheaper than numpy calls or slicing the sparse matrix.
+def rank_window_sentences(term_ids, index, start_idx, end_idx):
+    matrix = index["matrix"]
+    idf = index["vectorizer"].idf_
+    lo = matrix.indptr[start_idx]
+    bounds = (matrix.indptr[start_idx:end_idx + 2] - lo).tolist()
+    columns = matrix.indices[lo:lo + bounds[-1]].tolist()
+    data = matrix.data[lo:lo + bounds[-1]].tolist()
+    avg_length = max(index["avg_sentence_length"], 1.0)
+
+    scores = []
+    for row, length in enumerate(index["sentence_lengths"][start_idx:end_idx + 1].tolist()):
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        score = 0.0
+        for j in range(bounds[row], bounds[row + 1]):
+            if columns[j] in term_ids:
+                term_idf = float(idf[columns[j]])
+                tf = data[j] / term_idf
+                score += term_idf * tf * (BM25_K1 + 1) / (tf + length_norm)
+        scores.append(score)
+    return scores
+
+# Function to escape a sentence as HTML, wrapping the tokens that are query terms in <mark>
+def highlight_terms(sentence, term_ids, index):
+    vocabulary = index["vectorizer"].vocabulary_
+    parts = []
+    last = 0
+    for match in TOKEN_RE.finditer(sentence):
+        if vocabulary.get(match.group().lower()) in term_ids:
+            parts.append(html.escape(sentence[last:match.start()]))
+            parts.append(f"<mark>{html.escape(match.group())}</mark>")
+            last = match.end()
+    parts.append(html.escape(sentence[last:]))
+    return "".join(parts)
+
+# Function to pick the most relevant sentence of a retrieved window and cite where it came from.
+# With highlight=True the answer is HTML, with the query terms it contains marked.
+def answer_from_window(query, index, start_idx, end_idx, source=None, highlight=False):
+    with span("answer_select"):
+        term_ids = query_term_ids(query, index)
+        # Fallback to first sentence in the window when none shares a term with the query
+        best_idx = start_idx
+        if term_ids:
+            scores = rank_window_sentences(term_ids, index, start_idx, end_idx)
+            best = max(range(len(scores)), key=scores.__getitem__)
+            if scores[best] > 0:
+                best_idx = start_idx + best
+
+    answer = index["sentences"][best_idx]
+    citation = ", ".join(part for part in (source, cite_pages(index, best_idx, best_idx)) if part)
+    if highlight:
+        answer = highlight_terms(answer, term_ids, index)
+        citation = html.escape(citation)
+    return f"{answer} ({citation})" if citation else answer
+
+# Function to rebuild a fitted TfidfVectorizer from its vocabulary (terms in column order) and idf weights
+def vectorizer_from_vocabulary(terms, idf, norm=None):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)}, norm=norm)
+    vectorizer.idf_ = idf
+    return vectorizer
+
+# Function to return a fitted vectorizer's terms in column order
+def vocabulary_terms(vectorizer):
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term
+    return terms
@@ -0,0 +1,212 @@
+import os
+import time
+import itertools
+import threading
+from collections import deque
+from functools import partial
+from concurrent.futures.process import BrokenProcessPool
+from pdf_extract import (count_pdf_pages, get_extraction_pool, reset_extraction_pool, spool_document,
+                         release_document, timed_extract_page_range)
+from pdf_index import iter_page_indexes
+from telemetry import observe_span
+
+# Indexing job queue shared by every session of the PDF chatbot.
+#
+# Pages are extracted in the shared process pool (pdf_extract.get_extraction_pool), so
+# extraction never competes with queries for this process's GIL. A dispatcher thread hands
+# out page ranges one at a time, round-robin over the jobs that have ranges left, with at
+# most `max_in_flight` ranges in the pool: a 1000-page upload gets one turn per round like
+# a 10-page one, and a new upload takes the next turn, so small documents are not stuck
+# behind large ones. Each job also has at most `lookahead` ranges extracted ahead of its
+# indexing, which bounds the memory a fast pool can pile up. The PDF is spooled to a temporary
+# file once per job (pdf_extract.spool_document), so ranges carry its path, not its bytes.
+#
+# A consumer thread per job sentence-splits the pages in order and builds incremental
+# indexes (pdf_index.iter_page_indexes), passing each to on_index(pages_done, index) and
+# the final one to on_done(index). Job progress is a plain dict (see submit()) that the UI
+# reads without locking. cancel() stops a job: ranges not yet started are dropped and no
+# further index is published. A job submitted with is_alive (e.g. "the browser session is
+# still connected") is cancelled by the dispatcher once is_alive() returns False.
+
+# Seconds between checks that the owners of running jobs are still there
+REAP_INTERVAL = 5.0
+
+# Pages per scheduling turn: smaller than pdf_extract.PAGES_PER_TASK so turns rotate quickly
+# (workers keep each document's parsed reader, so a range costs little beyond its pages)
+QUEUE_PAGES_PER_TASK = 4
+
+class IndexingQueue:
+    def __init__(self, workers=None, pages_per_task=QUEUE_PAGES_PER_TASK, max_in_flight=None, lookahead=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.max_in_flight = max_in_flight or self.workers
+        self.lookahead = lookahead
+        # job id -> internal state of every job that is not finished yet
+        self._jobs = {}
+        # ids of jobs with ranges left to dispatch, in round-robin order
+        self._order = deque()
+        self._in_flight = 0
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pdf-index-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # Function to queue a PDF for indexing, returning its progress dict at once. The PDF is
+    # parsed by the job's thread: total_pages stays None until then, and an unreadable file
+    # ends the job with its error set.
+    def submit(self, name, pdf_bytes, on_index, on_done=None, is_alive=None):
+        job = {"id": next(self._ids), "name": name, "total_pages": None, "pages_extracted": 0,
+               "pages_done": 0, "sentences_indexed": 0, "searchable": False, "done": False,
+               "cancelled": False, "error": None}
+        state = {"job": job, "path": None, "ranges": [], "pending": deque(), "results": {}, "futures": set(),
+                 "dispatched": 0, "consumed": 0, "is_alive": is_alive}
+        with self._cond:
+            self._jobs[job["id"]] = state
+        threading.Thread(target=self._consume, args=(state, pdf_bytes, on_index, on_done),
+                         name=f"pdf-index-job-{job['id']}", daemon=True).start()
+        return job
+
+    # Function to count a job's pages and spool its PDF, then make its ranges dispatchable
+    def _start(self, state, pdf_bytes):
+        total_pages = count_pdf_pages(pdf_bytes)
+        state["path"] = spool_document(pdf_bytes)
+        ranges = [(start, min(start + self.pages_per_task, total_pages))
+                  for start in range(0, total_pages, self.pages_per_task)]
+        with self._cond:
+            state["job"]["total_pages"] = total_pages
+            state["ranges"] = ranges
+            state["pending"].extend(ranges)
+            # First in line for the next turn, then it rotates with the others
+            self._order.appendleft(state["job"]["id"])
+            self._cond.notify_all()
+
+    # Function to stop a job; ranges already extracting finish but are discarded
+    def cancel(self, job_id):
+        with self._cond:
+            state = self._jobs.get(job_id)
+            if state is None:
+                return
+            state["job"]["cancelled"] = True
+            # Cancelling runs _extracted, which removes the future from the set
+            for future in list(state["futures"]):
+                future.cancel()
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "jobs": len(self._jobs),
+                "ranges_in_flight": self._in_flight,
+                "pages_queued": sum(len(state["pending"]) for state in self._jobs.values()) * self.pages_per_task,
+            }
+
+    # Function to pick the next job to extract a range for (round-robin), or None
+    def _next_dispatchable(self):
+        for _ in range(len(self._order)):
+            state = self._jobs.get(self._order[0])
+            if state is None or state["job"]["cancelled"] or not state["pending"]:
+                self._order.popleft()
+                continue
+            self._order.rotate(-1)
+            if state["dispatched"] - state["consumed"] < self.lookahead:
+                return state
+        return None
+
+    def _dispatch(self):
+        next_reap = time.monotonic() + REAP_INTERVAL
+        while True:
+            owners = None
+            with self._cond:
+                state = self._next_dispatchable() if self._in_flight < self.max_in_flight else None
+                if state is None:
+                    self._cond.wait(max(0.0, next_reap - time.monotonic()))
+                else:
+                    start, stop = state["pending"].popleft()
+                    state["dispatched"] += 1
+                    pool = get_extraction_pool(self.workers)
+                    try:
+                        future = pool.submit(timed_extract_page_range, state["path"], start, stop)
+                    except Exception as exc:
+                        # The pool was shut down or a worker died: this job fails, the next gets a new pool
+                        if isinstance(exc, BrokenProcessPool):
+                            reset_extraction_pool(pool)
+                        state["results"][start] = exc
+                        self._cond.notify_all()
+                        state = None
+                    else:
+                        self._in_flight += 1
+                        state["futures"].add(future)
+                if time.monotonic() >= next_reap:
+                    owners = [(job_id, s["is_alive"]) for job_id, s in self._jobs.items() if s["is_alive"]]
+            if state is not None:
+                future.add_done_callback(partial(self._extracted, state, start, pool))
+            if owners is not None:
+                # Cancel the jobs whose owner went away (checked outside the lock)
+                next_reap = time.monotonic() + REAP_INTERVAL
+                for job_id, is_alive in owners:
+                    if not is_alive():
+                        self.cancel(job_id)
+
+    # Function to store an extracted range for the job's consumer (runs when the pool finishes it)
+    def _extracted(self, state, start, pool, future):
+        with self._cond:
+            self._in_flight -= 1
+            state["futures"].discard(future)
+            if future.cancelled():
+                result = None
+            else:
+                try:
+                    texts, seconds = future.result()
+                    observe_span("pdf_extract", seconds)
+                    state["job"]["pages_extracted"] += len(texts)
+                    result = texts
+                except Exception as exc:
+                    result = exc
+                    if isinstance(exc, BrokenProcessPool):
+                        reset_extraction_pool(pool)
+            state["results"][start] = result
+            self._cond.notify_all()
+
+    # Function to yield the job's (page_number, text) in page order as ranges come back
+    def _pages(self, state):
+        job = state["job"]
+        for start, _ in state["ranges"]:
+            with self._cond:
+                while start not in state["results"] and not job["cancelled"]:
+                    self._cond.wait()
+                if job["cancelled"]:
+                    return
+                texts = state["results"].pop(start)
+                state["consumed"] += 1
+                # Room for one more range of this job
+                self._cond.notify_all()
+            if isinstance(texts, Exception):
+                raise texts
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+
+    def _consume(self, state, pdf_bytes, on_index, on_done):
+        job = state["job"]
+        try:
+            self._start(state, pdf_bytes)
+            pdf_index = None
+            for pages_done, pdf_index in iter_page_indexes(self._pages(state)):
+                if job["cancelled"]:
+                    return
+                on_index(pages_done, pdf_index)
+                job.update(pages_done=pages_done, sentences_indexed=len(pdf_index["sentences"]), searchable=True)
+            if pdf_index is not None and on_done is not None and not job["cancelled"]:
+                on_done(pdf_index)
+        except Exception as exc:
+            job["error"] = str(exc)
+        finally:
+            with self._cond:
+                # After an error or cancellation, drop the ranges still waiting in the pool
+                for future in list(state["futures"]):
+                    future.cancel()
+                self._jobs.pop(job["id"], None)
+                job["done"] = True
+                self._cond.notify_all()
+            # A range still running after a cancellation may fail to open it; its result is discarded
+            if state["path"] is not None:
+                release_document(state["path"])
@@ -1,276 +1,200 @@
 import streamlit as st
-import PyPDF2
-import numpy as np
-import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-import nltk
-from nltk.tokenize import sent_tokenize
-from sklearn.metrics.pairwise import cosine_similarity
-from tensorflow.keras.preprocessing.text import text_to_word_sequence
-
-nltk.download('punkt')
-
-# Set Streamlit page
-st.set_page_config(
-    page_title="Nebula - PDF Chatbot",
-    page_icon="📄",
-    layout="wide"
-)
-
-# ---------------------- THEME TOGGLE ----------------------
-
-if "themes" not in st.session_state:
-    st.session_state.themes = {
-        "current_theme": "light",
-        "refreshed": True,
-        "light": {
-            "theme.base": "dark",
-            "theme.backgroundColor": "black",
-            "theme.primaryColor": "#57B4BA",
-            "theme.secondaryBackgroundColor": "#092635",
-            "theme.textColor": "white",
-            "button_face": "🌜"
-        },
-        "dark": {
-            "theme.base": "light",
-            "theme.backgroundColor": "white",
-            "theme.primaryColor": "#57B4BA",
-            "theme.secondaryBackgroundColor": "#F0EBE3",
-            "theme.textColor": "#0a1464",
-            "button_face": "🌞"
-        }
-    }
-
-def change_theme():
-    previous_theme = st.session_state.themes["current_theme"]
-    tdict = st.session_state.themes["light"] if previous_theme == "light" else st.session_state.themes["dark"]
-    
-    for vkey, vval in tdict.items():
-        if vkey.startswith("theme"):
-            st._config.set_option(vkey, vval)
-    
-    st.session_state.themes["refreshed"] = False
-    st.session_state.themes["current_theme"] = "dark" if previous_theme == "light" else "light"
-
-if st.session_state.themes["refreshed"]:
-    change_theme()
-
-# Custom CSS for WhatsApp-style chat
-st.markdown("""
-    <style>
-    .stForm {
-        padding: 0;
-        margin: 0;
-        background-color: transparent;
-    }
-    .stTextInput > div > div > input {
-        border: none;
-        border-radius: 10px;
-        padding: 8px 12px;
-        background-color: #f0f0f0;
-        color: #333;
-        width: 100%;
-    }
-    .stButton > button {
-        border: none;
-        border-radius: 10px;
-        padding: 8px 12px;
-        background-color: #57B4BA;
-        color: white;
-        margin-left: 10px;
-    }
-    .stButton > button:hover {
-        background-color: #468C91;
-    }
-    .chat-bubble {
-        max-width: 70%;
-        padding: 10px;
-        border-radius: 10px;
-        margin: 5px 0;
-        display: inline-block;
-    }
-    [data-baseweb="input"] input::placeholder {
-        color: #888;
-    }
-    body[theme-mode="dark"] [data-baseweb="input"] input::placeholder {
-        color: #ccc;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Function to extract text from PDF
-def extract_text_from_pdf(pdf_file):
-    pdf_reader = PyPDF2.PdfReader(pdf_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text
-
-# Function to preprocess PDF text
-def preprocess_pdf_text(pdf_text):
-    sentences = sent_tokenize(pdf_text)
-    sentences = [s.strip() for s in sentences if s.strip()]  # Remove empty sentences
-    return sentences
-
-# Function to create n-grams (N=1 to 6)
-def create_ngram_contexts(sentences, min_n=1, max_n=6):
-    contexts = []
-    for n in range(min_n, max_n + 1):
-        for i in range(len(sentences) - n + 1):
-            context = " ".join(sentences[i:i + n])
-            contexts.append((context, i, i + n - 1))  # Store context with start/end indices
-    return contexts
-
-# Function to process PDF and prepare TF-IDF
-def process_pdf_contexts(sentences):
-    contexts = create_ngram_contexts(sentences, min_n=1, max_n=6)
-    context_texts = [context[0] for context in contexts]  # Extract just the text for TF-IDF
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform(context_texts)
-    return vectorizer, tfidf_matrix, contexts, sentences
-
-# Function to get context-aware response
-def get_context_aware_response(query, vectorizer, tfidf_matrix, contexts, sentences):
-    query_vec = vectorizer.transform([query])
-    similarities = cosine_similarity(query_vec, tfidf_matrix)
-    best_context_idx = np.argmax(similarities)
-    
-    best_context, start_idx, end_idx = contexts[best_context_idx]
-    context_sentences = best_context.split(". ")
-    
-    # Find the most relevant sentence within the context
-    query_words = set(text_to_word_sequence(query.lower()))
-    best_sentence = None
-    max_overlap = 0
-    
-    for sentence in context_sentences:
-        sentence_words = set(text_to_word_sequence(sentence.lower()))
-        overlap = len(query_words.intersection(sentence_words))
-        if overlap > max_overlap:
-            max_overlap = overlap
-            best_sentence = sentence
-    
-    if best_sentence and max_overlap > 0:
-        return best_sentence
-    elif context_sentences:
-        return context_sentences[0]  # Fallback to first sentence in context
-    return "I couldn't find relevant information in the PDF. Please try rephrasing your query."
-
-# Sidebar Navigation
-st.sidebar.header("Navigation")
-page = st.sidebar.radio("Select a Page", ["PDF Chatbot", "Chatbot"])
-
-if page == "Chatbot":
-    os.system("streamlit run chatbot.py")
-    st.stop()
-
-# Theme Toggle Button
-current_theme = st.session_state.themes["current_theme"]
-if st.sidebar.button(
-    st.session_state.themes[current_theme]["button_face"] + " Toggle Theme",
-    key="theme_toggle"
-):
-    change_theme()
-    st.rerun()
-
-# Sidebar - Chatbot Details
-st.sidebar.header("📌 Chatbot Info")
-st.sidebar.text("🤖 Name: Nebula-AI")
-st.sidebar.text("👨‍💻 Developer: Shubham Gupta")
-st.sidebar.text("📜 Purpose: Context-Aware PDF Chatbot using N-Grams")
-
-# Sidebar - PDF Upload
-st.sidebar.header("Upload a PDF for Chat")
-uploaded_file = st.sidebar.file_uploader("Upload a PDF", type=["pdf"])
-
-# Initialize session state
-if "pdf_vectorizer" not in st.session_state:
-    st.session_state.pdf_vectorizer = None
-if "pdf_tfidf_matrix" not in st.session_state:
-    st.session_state.pdf_tfidf_matrix = None
-if "pdf_contexts" not in st.session_state:
-    st.session_state.pdf_contexts = None
-if "pdf_sentences" not in st.session_state:
-    st.session_state.pdf_sentences = None
-
-# Process PDF upload
-if uploaded_file and st.session_state.pdf_vectorizer is None:
-    pdf_text = extract_text_from_pdf(uploaded_file)
-    sentences = preprocess_pdf_text(pdf_text)
-    
-    with st.spinner("Processing PDF with n-grams... This may take a moment."):
-        vectorizer, tfidf_matrix, contexts, sentences = process_pdf_contexts(sentences)
-        st.session_state.pdf_vectorizer = vectorizer
-        st.session_state.pdf_tfidf_matrix = tfidf_matrix
-        st.session_state.pdf_contexts = contexts
-        st.session_state.pdf_sentences = sentences
-    st.sidebar.success("PDF processed with n-grams in session!")
-
-# Chat UI
-st.markdown("<h2 style='text-align: center;'>📄 Nebula - PDF Chatbot</h2>", unsafe_allow_html=True)
-
-user_bubble_color = "#57B4BA"
-bot_bubble_color = st.session_state.themes[current_theme]["theme.secondaryBackgroundColor"]
-text_color = st.session_state.themes[current_theme]["theme.textColor"]
-
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-
-for sender, message in st.session_state.chat_history:
-    if sender == "Nebula":
-        st.markdown(
-            f"""
-            <div style='display: flex; align-items: center;'>
-                <img src='https://img.icons8.com/fluency/48/000000/chatbot.png' width='40' height='40' style='margin-right:10px;'>
-                <div class='chat-bubble' style='background-color: {bot_bubble_color}; color: {text_color};'>
-                    <b>Nebula:</b> {message}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
+import html
+from pdf_index import cite_pages, hash_pdf_bytes
+from pdf_corpus import new_corpus, add_document, remove_document, search_corpus, get_corpus_response
+from pdf_cache import PdfIndexCache
+from pdf_jobs import IndexingQueue
+from ui_theme import init_theme, theme_toggle
+from transcript import get_transcript, append_turn, render_transcript
+from telemetry import start_exporters, request
+
+# The "PDF Chatbot" page. chatbot.py shows it in-process as one of its pages; running
+# `streamlit run pdfchat.py` serves this page on its own.
+
+# Seconds between refreshes of the indexing progress while documents are being indexed
+PROGRESS_REFRESH_SECONDS = 1.0
+
+# One on-disk index cache shared by every session in this process
+@st.cache_resource
+def get_pdf_cache():
+    return PdfIndexCache()
+
+# One indexing queue shared by every session, so uploads take turns on the extraction pool
+@st.cache_resource
+def get_indexing_queue():
+    return IndexingQueue()
+
+# Function to tell whether the current browser session is still connected (None if unknown)
+def session_checker():
+    try:
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        runtime, session_id = get_instance(), get_script_run_ctx().session_id
+    except Exception:
+        return None
+    if not hasattr(runtime, "is_active_session"):
+        return None
+    return lambda: runtime.is_active_session(session_id)
+
+# Function to drop a document from the session's corpus, cancelling its indexing
+def remove_pdf(pdf_hash):
+    job = st.session_state.pdf_jobs.pop(pdf_hash)
+    job["cancelled"] = True
+    if job.get("id") is not None:
+        get_indexing_queue().cancel(job["id"])
+    remove_document(st.session_state.pdf_corpus, pdf_hash)
+
+# Function to render each document's indexing status and the shared queue's load. While jobs
+# run it is a fragment re-rendered every PROGRESS_REFRESH_SECONDS (`refreshing` is True);
+# once they are all done, the whole page reruns so the timer stops.
+def render_indexing_progress(uploaded_hashes, refreshing=False):
+    pdf_jobs = st.session_state.pdf_jobs
+    for pdf_hash, job in list(pdf_jobs.items()):
+        if pdf_hash not in uploaded_hashes and st.button(f"✕ Remove {job['name']}", key=f"remove_{pdf_hash}"):
+            remove_pdf(pdf_hash)
+            st.rerun()
+        if job["error"]:
+            st.error(f"{job['name']}: could not process PDF: {job['error']}")
+        elif not job["done"]:
+            st.info(
+                f"{job['name']}: indexing... {job['pages_extracted']}/{job['total_pages'] or '?'} pages extracted, "
+                f"{job['sentences_indexed']} sentences indexed"
+                + (" (already searchable)" if job["searchable"] else "")
+            )
+        elif job["total_pages"] is None:
+            st.success(f"{job['name']}: loaded from cache!")
+        else:
+            st.success(f"{job['name']}: processed with n-grams in session!")
+
+    queue_stats = get_indexing_queue().stats()
+    if queue_stats["jobs"]:
+        st.caption(
+            f"Indexing queue: {queue_stats['jobs']} documents from all users, "
+            f"~{queue_stats['pages_queued']} pages waiting"
         )
-    else:
-        st.markdown(
-            f"""
-            <div style='display: flex; align-items: center; justify-content: flex-end;'>
-                <div class='chat-bubble' style='background-color: {user_bubble_color}; color: {text_color};'>
-                    <b>You:</b> {message}
-                </div>
-                <img src='https://img.icons8.com/fluency/48/000000/user-male-circle.png' width='40' height='40' style='margin-left:10px;'>
-            </div>
-            """,
-            unsafe_allow_html=True
+    if refreshing and all(job["done"] for job in pdf_jobs.values()):
+        st.rerun()
+
+# Function to render the PDF chat page. `remounted` is True when the user just switched to
+# this page: the uploader is then recreated empty, so documents missing from it are kept.
+def pdf_chat_page(remounted=False):
+    # Sidebar - PDF Upload
+    st.sidebar.header("Upload PDFs for Chat")
+    uploaded_files = st.sidebar.file_uploader("Upload PDFs", type=["pdf"], accept_multiple_files=True)
+
+    # Sidebar - Number of passages per answer
+    top_k = st.sidebar.slider("Passages per answer", min_value=1, max_value=5, value=1)
+
+    # Initialize session state: the session's corpus and one indexing job per document (by hash)
+    if "pdf_corpus" not in st.session_state:
+        st.session_state.pdf_corpus = new_corpus()
+    if "pdf_jobs" not in st.session_state:
+        st.session_state.pdf_jobs = {}
+    pdf_corpus = st.session_state.pdf_corpus
+    pdf_jobs = st.session_state.pdf_jobs
+    pdf_cache = get_pdf_cache()
+
+    # Add new uploads to the corpus (reusing cached indexes for PDFs processed before)
+    uploaded_hashes = set()
+    for uploaded_file in uploaded_files or []:
+        pdf_bytes = uploaded_file.getvalue()
+        pdf_hash = hash_pdf_bytes(pdf_bytes)
+        uploaded_hashes.add(pdf_hash)
+        if pdf_hash in pdf_jobs:
+            continue
+        pdf_index = pdf_cache.get(pdf_hash)
+        if pdf_index is not None:
+            add_document(pdf_corpus, pdf_hash, uploaded_file.name, pdf_index)
+            pdf_jobs[pdf_hash] = {"id": None, "name": uploaded_file.name, "total_pages": None,
+                                  "searchable": True, "done": True, "cancelled": False, "error": None}
+            continue
+        # Each partial index replaces the previous one in the corpus; the final one is cached
+        pdf_jobs[pdf_hash] = get_indexing_queue().submit(
+            uploaded_file.name, pdf_bytes,
+            on_index=lambda pages_done, pdf_index, pdf_hash=pdf_hash, name=uploaded_file.name:
+                add_document(pdf_corpus, pdf_hash, name, pdf_index),
+            on_done=lambda pdf_index, pdf_hash=pdf_hash: pdf_cache.put(pdf_hash, pdf_index),
+            is_alive=session_checker(),
         )
 
-# Input form
-with st.form(key='chat_form', clear_on_submit=True):
-    cols = st.columns([4, 1])
-    with cols[0]:
-        user_input = st.text_input(
-            "Type your message...", 
-            key="user_input", 
-            label_visibility="collapsed", 
-            placeholder="Nebula reading PDF 📑... Which part do you want? 🔍"
+    # Drop documents whose file was removed from the uploader; the rest stay indexed
+    if not remounted:
+        for pdf_hash in st.session_state.get("pdf_uploaded_hashes", set()) - uploaded_hashes:
+            if pdf_hash in pdf_jobs:
+                remove_pdf(pdf_hash)
+    st.session_state.pdf_uploaded_hashes = uploaded_hashes
+
+    # Sidebar - Indexing progress per document, refreshed on a timer while any job runs
+    refreshing = not all(job["done"] for job in pdf_jobs.values())
+    with st.sidebar:
+        st.fragment(render_indexing_progress, run_every=PROGRESS_REFRESH_SECONDS if refreshing else None)(
+            uploaded_hashes, refreshing
         )
-    with cols[1]:
-        submit_button = st.form_submit_button(label="Send")
 
-# Process input
-if submit_button and user_input:
-    # Check if all required session state variables are not None
-    if (st.session_state.pdf_vectorizer is not None and 
-        st.session_state.pdf_tfidf_matrix is not None and 
-        st.session_state.pdf_contexts is not None and 
-        st.session_state.pdf_sentences is not None):
-        response = get_context_aware_response(
-            user_input, 
-            st.session_state.pdf_vectorizer, 
-            st.session_state.pdf_tfidf_matrix, 
-            st.session_state.pdf_contexts, 
-            st.session_state.pdf_sentences
-        )
-    else:
-        response = "Please upload a PDF first to start chatting."
-    st.session_state.chat_history.append(("You", user_input))
-    st.session_state.chat_history.append(("Nebula", response))
-    st.rerun()
\ No newline at end of file
+    # Sidebar - Index cache stats
+    cache_stats = pdf_cache.stats()
+    st.sidebar.caption(
+        f"Index cache: {cache_stats['hit_rate']:.0%} hit rate "
+        f"({cache_stats['hits']} hits / {cache_stats['misses']} misses), "
+        f"{cache_stats['documents']} docs, {cache_stats['bytes_on_disk'] / 1024 / 1024:.1f} MB on disk"
+    )
+
+    # Chat UI
+    st.markdown("<h2 style='text-align: center;'>📄 Nebula - PDF Chatbot</h2>", unsafe_allow_html=True)
+
+    # Kept apart from the intent chat's transcript, which lives in the same session
+    transcript = get_transcript("pdf")
+    render_transcript(transcript)
+
+    # Input form
+    with st.form(key='pdf_chat_form', clear_on_submit=True):
+        cols = st.columns([4, 1])
+        with cols[0]:
+            user_input = st.text_input(
+                "Type your message...", 
+                key="pdf_user_input", 
+                label_visibility="collapsed", 
+                placeholder="Nebula reading PDF 📑... Which part do you want? 🔍"
+            )
+        with cols[1]:
+            submit_button = st.form_submit_button(label="Send")
+
+    # Process input
+    if submit_button and user_input:
+        with request("pdf_chat"):
+            # Check that at least one PDF has been (at least partly) indexed in this session
+            if pdf_corpus["documents"]:
+                response = get_corpus_response(user_input, pdf_corpus, highlight=True)
+                if top_k > 1:
+                    # Show the next best distinct passages across all documents under the answer
+                    passages = search_corpus(user_input, pdf_corpus, k=top_k, non_overlapping=True)[1:]
+                    if passages:
+                        response += "<br><br><b>Other relevant passages:</b>"
+                        for doc_id, name, context, start_idx, end_idx, score in passages:
+                            document = pdf_corpus["documents"].get(doc_id)
+                            citation = cite_pages(document["index"], start_idx, end_idx) if document else ""
+                            response += (f"<br>• {html.escape(context)} <i>({html.escape(name)}"
+                                         f"{', ' + citation if citation else ''}, score {score:.2f})</i>")
+            else:
+                response = "Please upload a PDF first to start chatting."
+        append_turn(transcript, "You", user_input)
+        append_turn(transcript, "Nebula", response)
+        st.rerun()
+
+if __name__ == "__main__":
+    st.set_page_config(
+        page_title="Nebula - PDF Chatbot",
+        page_icon="📄",
+        layout="wide"
+    )
+    init_theme()
+    theme_toggle()
+    start_exporters()
+
+    # Sidebar - Chatbot Details
+    st.sidebar.header("📌 Chatbot Info")
+    st.sidebar.text("🤖 Name: Nebula-AI")
+    st.sidebar.text("👨‍💻 Developer: Shubham Gupta")
+    st.sidebar.text("📜 Purpose: Context-Aware PDF Chatbot using N-Grams")
+
+    pdf_chat_page()
@@ -0,0 +1,86 @@
+import re
+import time
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from nlp_resources import get_lemmatizer
+
+@lru_cache(maxsize=65536)
+def lemmatize_word(word):
+    lemmatizer = get_lemmatizer()
+    return lemmatizer.lemmatize(word) if lemmatizer is not None else word
+
+# Function to normalize a message the way ChatbotClassifers.ipynb preprocesses patterns:
+# lowercase, strip punctuation, lemmatize each word
+def normalize_text(text):
+    return " ".join(lemmatize_word(word) for word in re.findall(r"\w+", text.lower()))
+
+# Function to name how normalize_text() behaves in this process: it only lemmatizes when the
+# wordnet data is installed, so keys normalized elsewhere may not match keys normalized here
+def normalization_mode():
+    return "lemmatized" if get_lemmatizer() is not None else "lowercase"
+
+# In-process LRU cache of classifier results keyed by normalized message.
+#
+# Entries hold (class index, confidence), not a response, so callers still pick a random
+# response for every hit. Entries expire after ttl seconds, the least recently used are
+# dropped beyond max_entries, and the whole cache is cleared as soon as it is used with a
+# different model version (the intent model's artifact version and intents.json hash).
+class ResponseCache:
+    def __init__(self, max_entries=4096, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Function to drop every entry if model_version differs from the one the entries came from
+    def _check_version(self, model_version):
+        if model_version != self.version:
+            self._entries.clear()
+            self.version = model_version
+
+    # Function to look up many keys at once, returning (class index, confidence) or None per key
+    def get_many(self, keys, model_version):
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            self._check_version(model_version)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results.append(entry[1])
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    self.misses += 1
+                    results.append(None)
+        return results
+
+    # Function to store {key: (class index, confidence)} computed with model_version
+    def put_many(self, items, model_version):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._check_version(model_version)
+            for key, value in items.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
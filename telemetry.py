@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import atexit
+import bisect
+import datetime
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Lightweight tracing and metrics for both bots (standard library only, so PDF extraction
+# workers can import it).
+#
+# span(name) times a block and adds it to the histogram nebula_span_seconds{span="<name>"};
+# request(name) does the same for a whole user request in nebula_request_seconds. Histograms
+# have fixed buckets, so recording costs a couple of microseconds. render_prometheus() exports
+# them in the Prometheus text format, which is served on /metrics by inference_server.py and,
+# once start_exporters() ran, on NEBULA_METRICS_PORT and/or written to NEBULA_METRICS_FILE.
+#
+# With NEBULA_PROFILE_SLOW_MS set, a sampling profiler snapshots the stack of every thread
+# inside request() every PROFILE_INTERVAL seconds. Requests slower than the threshold have
+# their samples appended to NEBULA_PROFILE_FILE as collapsed stacks ("frame;frame;... count"
+# per line, the input of flamegraph.pl), under a root frame naming the request.
+
+# Upper bounds (seconds) of the histogram buckets, from 100us to a minute
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SPAN_METRIC = "nebula_span_seconds"
+REQUEST_METRIC = "nebula_request_seconds"
+SLOW_REQUESTS_METRIC = "nebula_slow_requests_total"
+
+METRIC_HELP = {
+    SPAN_METRIC: "Time spent in each instrumented stage.",
+    REQUEST_METRIC: "End-to-end time of user requests.",
+}
+
+METRICS_PORT = os.environ.get("NEBULA_METRICS_PORT")
+METRICS_FILE = os.environ.get("NEBULA_METRICS_FILE")
+METRICS_FILE_INTERVAL = 5.0
+SLOW_REQUEST_MS = os.environ.get("NEBULA_PROFILE_SLOW_MS")
+PROFILE_FILE = os.path.abspath(os.environ.get("NEBULA_PROFILE_FILE", "slow_requests.folded"))
+PROFILE_INTERVAL = 0.005
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    # Function to get (cumulative bucket counts, sum, count) as of now
+    def snapshot(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = []
+        running = 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, count
+
+# (metric, label, value) -> Histogram
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+# Slow requests recorded by the profiler, per request name
+slow_requests = Counter()
+
+# Function to get (creating on first use) the histogram of one labelled series
+def get_histogram(metric, label, value):
+    key = (metric, label, value)
+    histogram = _histograms.get(key)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(key, Histogram())
+    return histogram
+
+def observe_span(name, seconds):
+    get_histogram(SPAN_METRIC, "span", name).observe(seconds)
+
+def observe_request(name, seconds):
+    get_histogram(REQUEST_METRIC, "request", name).observe(seconds)
+
+# Function to time a block as the named stage
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_span(name, time.perf_counter() - start)
+
+# Function to time a block as one user request (and profile it if it turns out slow)
+@contextmanager
+def request(name):
+    profiler = _profiler
+    if profiler is not None:
+        profiler.begin()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe_request(name, elapsed)
+        if profiler is not None:
+            profiler.end(name, elapsed)
+
+# Function to format a float the way Prometheus expects
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+# Function to render every histogram in the Prometheus text exposition format
+def render_prometheus():
+    with _histograms_lock:
+        series = sorted(_histograms.items())
+    lines = []
+    current = None
+    for (metric, label, value), histogram in series:
+        if metric != current:
+            current = metric
+            lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+        cumulative, total, count = histogram.snapshot()
+        for bound, bucket_count in zip(histogram.buckets + (float("inf"),), cumulative):
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="{format_value(bound)}"}} {bucket_count}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {format_value(total)}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+    if slow_requests:
+        lines.append(f"# HELP {SLOW_REQUESTS_METRIC} Requests slower than NEBULA_PROFILE_SLOW_MS.")
+        lines.append(f"# TYPE {SLOW_REQUESTS_METRIC} counter")
+        for name, count in sorted(slow_requests.items()):
+            lines.append(f'{SLOW_REQUESTS_METRIC}{{request="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+# Function to write the metrics atomically (e.g. for node_exporter's textfile collector)
+def write_prometheus(path):
+    tmp_path = path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+# Function to describe a stack as "file:function;file:function;..." from the outermost frame
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        names.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+# Samples the stacks of threads that are inside request() and keeps those of slow requests
+class SlowRequestProfiler:
+    def __init__(self, threshold, path=PROFILE_FILE, interval=PROFILE_INTERVAL):
+        self.threshold = threshold
+        self.path = path
+        self.interval = interval
+        # thread id -> Counter of collapsed stacks sampled during its current request
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def begin(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+
+    def end(self, name, elapsed):
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or elapsed < self.threshold:
+            return
+        slow_requests[name] += 1
+        root = f"{name} {datetime.datetime.now().isoformat(timespec='seconds')} {elapsed * 1000:.0f}ms"
+        with self._lock, open(self.path, "a") as f:
+            for stack, count in samples.items():
+                f.write(f"{root};{stack} {count}\n")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[collapse_stack(frame)] += 1
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_profiler = None
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+# Function to start the exporters and profiler configured by the environment (once per process)
+def start_exporters(port=METRICS_PORT, path=METRICS_FILE, slow_ms=SLOW_REQUEST_MS):
+    global _profiler, _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        if slow_ms:
+            _profiler = SlowRequestProfiler(float(slow_ms) / 1000)
+        if port:
+            server = ThreadingHTTPServer(("127.0.0.1", int(port)), MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if path:
+            def write_periodically():
+                while True:
+                    time.sleep(METRICS_FILE_INTERVAL)
+                    write_prometheus(path)
+            threading.Thread(target=write_periodically, name="metrics-file", daemon=True).start()
+            atexit.register(write_prometheus, path)
@@ -0,0 +1,77 @@
+import csv
+import pytest
+from chat_log import HEADER, compact_segment
+from chat_history import ChatHistoryStore
+
+# Rows in time order, several sharing a timestamp so pages must break ties on id
+ROWS = [(f"message {i} {'weather' if i % 3 == 0 else 'chat'}", f"reply {i}", f"2026-01-{1 + i // 7:02d} 12:00:00")
+        for i in range(100)]
+
+@pytest.fixture(params=["fts", "like"])
+def store(request, tmp_path):
+    store = ChatHistoryStore(str(tmp_path / "history.db"), str(tmp_path / "none.csv"), str(tmp_path / "archive"))
+    if request.param == "fts":
+        if not store.has_fts:
+            pytest.skip("SQLite without FTS5 trigram tokenizer")
+    else:
+        store.has_fts = False
+    store.append_rows(ROWS)
+    return store
+
+# Function to follow page() cursors to the end, returning the pages
+def all_pages(store, limit, **filters):
+    pages, before = [], None
+    while True:
+        rows, before = store.page(limit=limit, before=before, **filters)
+        pages.append(rows)
+        if before is None:
+            return pages
+
+# Function to get the ids of the rows matching a filter, newest first
+def expected_ids(start=None, end=None, search=None):
+    matches = [i + 1 for i, (user_input, response, timestamp) in enumerate(ROWS)
+               if (start is None or timestamp >= start) and (end is None or timestamp <= end)
+               and (search is None or search in user_input or search in response)]
+    return matches[::-1]
+
+@pytest.mark.parametrize("limit", [1, 7, 20, 100, 150])
+def test_cursors_return_each_row_once_newest_first(store, limit):
+    pages = all_pages(store, limit)
+    ids = [row[0] for rows in pages for row in rows]
+    assert ids == expected_ids()
+    assert all(len(rows) == limit for rows in pages[:-1])
+    assert len(pages[-1]) <= limit
+
+@pytest.mark.parametrize("filters", [
+    {"search": "weather"},
+    {"search": "message 4"},
+    {"start": "2026-01-03 00:00:00", "end": "2026-01-09 23:59:59"},
+    {"start": "2026-01-03 00:00:00", "end": "2026-01-09 23:59:59", "search": "weather"},
+    {"search": "no such text"},
+    {"start": "2027-01-01 00:00:00", "search": "weather"},
+])
+def test_filtered_pages_return_each_match_once(store, filters):
+    ids = [row[0] for rows in all_pages(store, 6, **filters) for row in rows]
+    assert ids == expected_ids(**filters)
+
+def test_search_is_literal(store):
+    store.append_rows([("100% sure_thing", "ok", "2026-02-01 00:00:00"), ("100 percent", "ok", "2026-02-01 00:00:01")])
+    rows, _ = store.page(search="0% s")
+    assert [row[1] for row in rows] == ["100% sure_thing"]
+    rows, _ = store.page(search="e_t")
+    assert [row[1] for row in rows] == ["100% sure_thing"]
+
+def test_imports_existing_logs_once(tmp_path):
+    log_path, archive_dir = tmp_path / "chat_log.csv", tmp_path / "archive"
+    archive_dir.mkdir()
+    segment = archive_dir / "chat_log-20260101-000000-000000-1.csv"
+    for path, rows in [(segment, ROWS[:10]), (log_path, ROWS[10:15])]:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([HEADER] + [list(row) for row in rows])
+    compact_segment(str(segment))
+
+    for _ in range(2):
+        store = ChatHistoryStore(str(tmp_path / "history.db"), str(log_path), str(archive_dir))
+        rows, cursor = store.page(limit=100)
+        assert [row[1:] for row in rows] == ROWS[:15][::-1]
+        assert cursor is None
@@ -0,0 +1,105 @@
+import os
+import csv
+import sys
+import datetime
+import subprocess
+from chat_log import ChatLogWriter, HEADER, list_archives, read_archive
+
+# Function to read every row ever written: compacted archives (oldest first), then the active file
+def read_all_rows(log_path, archive_dir):
+    rows = []
+    for archive_path in list_archives(archive_dir):
+        columns = read_archive(archive_path)
+        rows.extend(zip(*(columns[name] for name in HEADER)))
+    if os.path.exists(log_path):
+        with open(log_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            assert next(reader) == HEADER
+            rows.extend(tuple(row) for row in reader)
+    return rows
+
+def test_rows_are_flushed_in_order(tmp_path):
+    log_path, archive_dir = str(tmp_path / "chat_log.csv"), str(tmp_path / "archive")
+    writer = ChatLogWriter(log_path, archive_dir, flush_interval=0.01)
+    for i in range(50):
+        writer.log(f"hello {i}", f"reply {i}", "2026-01-01 00:00:00")
+    writer.close()
+    assert read_all_rows(log_path, archive_dir) == [(f"hello {i}", f"reply {i}", "2026-01-01 00:00:00") for i in range(50)]
+    assert list_archives(archive_dir) == []
+
+def test_rotates_by_size_without_losing_rows(tmp_path):
+    log_path, archive_dir = str(tmp_path / "chat_log.csv"), str(tmp_path / "archive")
+    writer = ChatLogWriter(log_path, archive_dir, max_bytes=2000, flush_interval=0.01, max_batch=10)
+    expected = []
+    for i in range(300):
+        row = (f"question number {i}, with a comma", f"answer {i}", "2026-01-01 00:00:00")
+        expected.append(row)
+        writer.log(*row)
+    writer.close()
+    assert len(list_archives(archive_dir)) > 1
+    assert not [name for name in os.listdir(archive_dir) if name.endswith(".csv")]
+    assert read_all_rows(log_path, archive_dir) == expected
+
+def test_rotates_when_the_day_changes(tmp_path):
+    log_path, archive_dir = str(tmp_path / "chat_log.csv"), str(tmp_path / "archive")
+    writer = ChatLogWriter(log_path, archive_dir, flush_interval=0.01)
+    writer.log("yesterday", "reply", "2026-01-01 23:59:59")
+    writer.flush()
+    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
+    os.utime(log_path, (yesterday, yesterday))
+    writer.log("today", "reply", "2026-01-02 00:00:01")
+    writer.close()
+    archives = list_archives(archive_dir)
+    assert len(archives) == 1
+    assert read_archive(archives[0])["User Input"] == ["yesterday"]
+    assert [row[0] for row in read_all_rows(log_path, archive_dir)] == ["yesterday", "today"]
+
+# Each process writes its rows in small batches to a log that rotates every few batches
+WRITER_SNIPPET = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from chat_log import ChatLogWriter
+writer = ChatLogWriter(sys.argv[2], sys.argv[3], max_bytes=3000, flush_interval=0.001, max_batch=5)
+for i in range(int(sys.argv[5])):
+    writer.log(f"{sys.argv[4]}-{i}", "reply", "2026-01-01 00:00:00")
+    if i % 5 == 4:
+        writer.flush()
+writer.close()
+"""
+
+def test_processes_share_the_log_through_rotations(tmp_path):
+    log_path, archive_dir = str(tmp_path / "chat_log.csv"), str(tmp_path / "archive")
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    writers, rows_each = 3, 200
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WRITER_SNIPPET, repo_root, log_path, archive_dir, f"p{n}", str(rows_each)])
+        for n in range(writers)
+    ]
+    for process in processes:
+        assert process.wait(timeout=120) == 0
+    rows = read_all_rows(log_path, archive_dir)
+    # Every row exactly once and unbroken, each process's rows in the order it wrote them
+    assert sorted(row[0] for row in rows) == sorted(f"p{n}-{i}" for n in range(writers) for i in range(rows_each))
+    assert all(row[1:] == ("reply", "2026-01-01 00:00:00") for row in rows)
+    for n in range(writers):
+        mine = [int(row[0].split("-")[1]) for row in rows if row[0].startswith(f"p{n}-")]
+        assert mine == sorted(mine)
+    assert len(list_archives(archive_dir)) > 1
+
+class FailingHistoryStore:
+    def append_rows(self, rows):
+        raise RuntimeError("store unavailable")
+
+def test_write_failures_are_counted_and_reported_on_stderr(tmp_path, capsys):
+    log_path = str(tmp_path / "missing" / "chat_log.csv")
+    writer = ChatLogWriter(log_path, str(tmp_path / "archive"), flush_interval=0.01,
+                           history_store=FailingHistoryStore())
+    writer.log("first", "reply", "2026-01-01 00:00:00")
+    writer.flush()
+    writer.log("second", "reply", "2026-01-01 00:00:00")
+    writer.close()
+    assert (writer.write_failures, writer.history_failures) == (2, 2)
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "chat log: failed to write 1 rows (2 failed batches)" in captured.err
+    assert "chat history: failed to store 1 rows (2 failed batches)" in captured.err
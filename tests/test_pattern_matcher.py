@@ -0,0 +1,56 @@
+import random
+import pytest
+from pattern_matcher import edit_distance, bounded_edit_distance, PatternMatcher
+from response_cache import normalize_text
+
+# Function to compute the plain Levenshtein distance (full table)
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+# Random pairs over a small alphabet, so distances of every size occur
+def random_string(rng):
+    return "".join(rng.choices("abc ", k=rng.randint(0, 12)))
+
+_rng = random.Random(0)
+PAIRS = [(random_string(_rng), random_string(_rng)) for _ in range(400)]
+
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3, 5, 8])
+def test_edit_distance_matches_levenshtein_within_the_bound(max_distance):
+    for a, b in PAIRS:
+        expected = levenshtein(a, b)
+        expected = expected if expected <= max_distance else max_distance + 1
+        assert edit_distance(a, b, max_distance) == expected, (a, b)
+        assert bounded_edit_distance(a, b, max_distance) == expected, (a, b)
+
+def test_edit_distance_edge_cases():
+    assert edit_distance("", "", 0) == 0
+    assert edit_distance("", "abc", 3) == 3
+    assert edit_distance("abc", "", 2) == 3
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3
+
+@pytest.fixture
+def matcher():
+    patterns = ["What is your name", "Tell me a joke please", "How is the weather today", "Hello", "Hello"]
+    classes = [0, 1, 2, 3, 4]
+    return PatternMatcher(patterns, classes)
+
+def test_exact_match_ignores_case_and_punctuation(matcher):
+    assert matcher.match(normalize_text("what is your NAME?")) == (0, 1.0, "exact")
+
+def test_near_match_within_the_edit_budget(matcher):
+    cls, confidence, path = matcher.match(normalize_text("Tell me a jkoe please"))
+    assert (cls, path) == (1, "fuzzy")
+    assert 0 < confidence < 1
+
+def test_no_match_for_unrelated_or_ambiguous_messages(matcher):
+    assert matcher.match(normalize_text("completely different words here")) is None
+    # "hello" belongs to two classes, so it is left to the classifier
+    assert matcher.match(normalize_text("Hello")) is None
+    assert matcher.match("") is None
@@ -0,0 +1,126 @@
+import os
+import glob
+import time
+import signal
+import tempfile
+import threading
+import pytest
+import pdf_jobs
+import pdf_extract
+from pdf_jobs import IndexingQueue
+from pdf_index import iter_incremental_indexes
+from benchmarks.synthetic_pdf import make_synthetic_pdf
+
+# Workers are spawned processes, so every queue shares one two-worker pool
+WORKERS = 2
+
+@pytest.fixture(scope="module")
+def small_pdf():
+    return make_synthetic_pdf(10, seed=1)
+
+@pytest.fixture(scope="module")
+def large_pdf():
+    return make_synthetic_pdf(400)
+
+@pytest.fixture
+def queue():
+    return IndexingQueue(workers=WORKERS)
+
+# Function to wait until a job is done, failing the test after `timeout` seconds
+def wait_done(job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not job["done"]:
+        assert time.monotonic() < deadline, f"job {job['name']} did not finish"
+        time.sleep(0.01)
+
+def wait_for(condition, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+def spooled_files():
+    return glob.glob(os.path.join(tempfile.gettempdir(), f"nebula-pdf-{os.getpid()}-*"))
+
+def test_builds_the_same_index_as_in_process_extraction(queue, small_pdf):
+    published, final = [], []
+    job = queue.submit("small", small_pdf, on_index=lambda pages_done, index: published.append(pages_done),
+                       on_done=final.append)
+    wait_done(job)
+    _, expected = list(iter_incremental_indexes(small_pdf, workers=0))[-1]
+    assert job["error"] is None and not job["cancelled"]
+    assert final[0]["sentences"] == expected["sentences"]
+    assert final[0]["pages"] == expected["pages"]
+    assert published == sorted(published) and published[-1] == 10
+    assert job["pages_extracted"] == job["pages_done"] == job["total_pages"] == 10
+    assert job["sentences_indexed"] == len(expected["sentences"]) and job["searchable"]
+    assert queue.stats() == {"jobs": 0, "ranges_in_flight": 0, "pages_queued": 0}
+    assert spooled_files() == []
+
+def test_unreadable_upload_ends_the_job_with_an_error(queue):
+    job = queue.submit("broken.pdf", b"not a pdf at all", on_index=lambda pages_done, index: None)
+    wait_done(job)
+    assert job["error"] and job["total_pages"] is None and not job["searchable"]
+    assert queue.stats() == {"jobs": 0, "ranges_in_flight": 0, "pages_queued": 0}
+
+def test_small_upload_finishes_while_a_large_one_is_in_flight(queue, small_pdf, large_pdf):
+    large = queue.submit("large", large_pdf, on_index=lambda pages_done, index: None)
+    wait_for(lambda: large["pages_extracted"] > 0)
+    small = queue.submit("small", small_pdf, on_index=lambda pages_done, index: None)
+    wait_done(small)
+    assert small["error"] is None and small["pages_done"] == 10
+    assert not large["done"] and large["pages_extracted"] < large["total_pages"]
+    queue.cancel(large["id"])
+    wait_done(large)
+
+def test_cancel_drops_pending_ranges(queue, large_pdf):
+    done = []
+    job = queue.submit("large", large_pdf, on_index=lambda pages_done, index: None, on_done=done.append)
+    wait_for(lambda: job["pages_extracted"] > 0)
+    queue.cancel(job["id"])
+    wait_done(job)
+    extracted = job["pages_extracted"]
+    assert job["cancelled"] and job["error"] is None and done == []
+    assert extracted < job["total_pages"]
+    # Nothing more is dispatched for it, and the ranges that were running are accounted for
+    wait_for(lambda: queue.stats()["ranges_in_flight"] == 0)
+    time.sleep(0.2)
+    assert queue.stats() == {"jobs": 0, "ranges_in_flight": 0, "pages_queued": 0}
+    assert job["pages_extracted"] - extracted <= WORKERS * pdf_jobs.QUEUE_PAGES_PER_TASK
+    assert spooled_files() == []
+
+def test_reaps_jobs_whose_owner_went_away(monkeypatch, large_pdf):
+    monkeypatch.setattr(pdf_jobs, "REAP_INTERVAL", 0.05)
+    queue = IndexingQueue(workers=WORKERS)
+    alive = threading.Event()
+    alive.set()
+    job = queue.submit("large", large_pdf, on_index=lambda pages_done, index: None, is_alive=alive.is_set)
+    wait_for(lambda: job["pages_extracted"] > 0)
+    alive.clear()
+    wait_done(job)
+    assert job["cancelled"] and job["pages_extracted"] < job["total_pages"]
+
+def test_ranges_in_flight_stay_within_the_limit(queue, small_pdf, large_pdf):
+    jobs = [queue.submit(f"doc-{i}", pdf, on_index=lambda pages_done, index: None)
+            for i, pdf in enumerate([large_pdf, small_pdf, small_pdf, small_pdf])]
+    peak = 0
+    while not all(job["done"] for job in jobs):
+        peak = max(peak, queue.stats()["ranges_in_flight"])
+        time.sleep(0.002)
+    assert 0 < peak <= queue.max_in_flight
+    assert all(job["error"] is None for job in jobs)
+    assert queue.stats() == {"jobs": 0, "ranges_in_flight": 0, "pages_queued": 0}
+
+def test_recovers_when_a_worker_dies(queue, small_pdf, large_pdf):
+    job = queue.submit("large", large_pdf, on_index=lambda pages_done, index: None)
+    wait_for(lambda: job["pages_extracted"] > 0)
+    for pid in list(pdf_extract.get_extraction_pool(WORKERS)._processes):
+        os.kill(pid, signal.SIGKILL)
+    wait_done(job)
+    assert job["error"] and not job["cancelled"]
+    # The broken pool is replaced, so the next upload is indexed normally
+    job = queue.submit("small", small_pdf, on_index=lambda pages_done, index: None)
+    wait_done(job)
+    assert job["error"] is None and job["pages_done"] == 10
+    assert queue.stats()["ranges_in_flight"] == 0
+    assert spooled_files() == []
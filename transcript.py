@@ -0,0 +1,83 @@
+import html
+import uuid
+import streamlit as st
+from chat_history import ChatHistoryStore
+from ui_theme import bubble_colors
+
+# Chat transcript component shared by both chat pages.
+#
+# A transcript keeps at most `max_in_memory` turns in the session; when it grows past that,
+# the oldest half is spilled to the history store (ChatHistoryStore.spill_turns) under the
+# session's id. Each rerun renders only the newest `window` turns as a single HTML block, so
+# rerun time does not grow with the conversation. "Show older messages" extends the view by
+# one window at a time, reading spilled turns back from the store when needed.
+
+WINDOW_TURNS = 20
+MAX_TURNS_IN_MEMORY = 200
+
+# Avatars are inline so a long transcript doesn't reference an external image per bubble
+AVATARS = {"Nebula": "🤖", "You": "🧑"}
+
+# One history store per process, shared by every session and page
+@st.cache_resource
+def get_history_store():
+    return ChatHistoryStore()
+
+# Function to get (creating on first use) the session's transcript called `name`
+def get_transcript(name):
+    key = f"transcript_{name}"
+    if key not in st.session_state:
+        st.session_state[key] = {
+            "name": name,
+            "session_id": uuid.uuid4().hex,
+            "turns": [],        # (seq, sender, message), newest last
+            "next_seq": 0,
+            "shown": WINDOW_TURNS,
+        }
+    return st.session_state[key]
+
+# Function to add a turn, spilling the oldest turns to the store once the session holds too many
+def append_turn(transcript, sender, message, store=None, max_in_memory=MAX_TURNS_IN_MEMORY):
+    transcript["turns"].append((transcript["next_seq"], sender, message))
+    transcript["next_seq"] += 1
+    # Back to the newest window whenever the conversation moves on
+    transcript["shown"] = WINDOW_TURNS
+    if len(transcript["turns"]) > max_in_memory:
+        store = store or get_history_store()
+        spill = len(transcript["turns"]) - max_in_memory // 2
+        store.spill_turns(transcript["session_id"], transcript["name"], transcript["turns"][:spill])
+        del transcript["turns"][:spill]
+
+# Function to build one chat bubble
+def bubble_html(sender, message, colors):
+    user_bubble_color, bot_bubble_color, text_color = colors
+    if sender == "Nebula":
+        return (f"<div style='display: flex; align-items: center;'>"
+                f"<span style='font-size: 28px; margin-right: 10px;'>{AVATARS['Nebula']}</span>"
+                f"<div class='chat-bubble' style='background-color: {bot_bubble_color}; color: {text_color};'>"
+                f"<b>Nebula:</b> {message}</div></div>")
+    return (f"<div style='display: flex; align-items: center; justify-content: flex-end;'>"
+            f"<div class='chat-bubble' style='background-color: {user_bubble_color}; color: {text_color};'>"
+            f"<b>You:</b> {html.escape(message)}</div>"
+            f"<span style='font-size: 28px; margin-left: 10px;'>{AVATARS['You']}</span></div>")
+
+# Function to render the newest `transcript["shown"]` turns, with a button to page in older ones
+def render_transcript(transcript, store=None):
+    turns = transcript["turns"]
+    shown = transcript["shown"]
+    visible = turns[-shown:]
+    oldest_seq = visible[0][0] if visible else transcript["next_seq"]
+    if shown > len(turns) and oldest_seq > 0:
+        # Read the rest of the requested window back from the store
+        store = store or get_history_store()
+        visible = store.load_turns(transcript["session_id"], transcript["name"], oldest_seq, shown - len(turns)) + visible
+        oldest_seq = visible[0][0] if visible else oldest_seq
+
+    if oldest_seq > 0 and st.button(f"Show older messages ({oldest_seq} more)", key=f"older_{transcript['name']}"):
+        transcript["shown"] = shown + WINDOW_TURNS
+        st.rerun()
+
+    if visible:
+        colors = bubble_colors()
+        st.markdown("".join(bubble_html(sender, message, colors) for _, sender, message in visible),
+                    unsafe_allow_html=True)
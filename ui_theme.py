@@ -0,0 +1,112 @@
+import streamlit as st
+
+# Theme and chat styling shared by every page of the app
+
+THEMES = {
+    "light": {
+        "theme.base": "dark",
+        "theme.backgroundColor": "black",
+        "theme.primaryColor": "#57B4BA",  # Kept for consistency, but not used for user bubble
+        "theme.secondaryBackgroundColor": "#092635",
+        "theme.textColor": "white",
+        "button_face": "🌜"
+    },
+    "dark": {
+        "theme.base": "light",
+        "theme.backgroundColor": "white",
+        "theme.primaryColor": "#57B4BA",  # Kept for consistency, but not used for user bubble
+        "theme.secondaryBackgroundColor": "#F0EBE3",
+        "theme.textColor": "#0a1464",
+        "button_face": "🌞"
+    }
+}
+
+# User bubble color is the same teal in both themes
+USER_BUBBLE_COLOR = "#57B4BA"
+
+# Custom CSS to style the interface with WhatsApp-like chat bubbles
+CHAT_CSS = """
+    <style>
+    /* Style the input form */
+    .stForm {
+        padding: 0;
+        margin: 0;
+        background-color: transparent;
+    }
+
+    .stTextInput > div > div > input {
+        border: none;
+        border-radius: 10px;
+        padding: 8px 12px;
+        background-color: #f0f0f0;
+        color: #333;
+        width: 100%;
+    }
+
+    .stButton > button {
+        border: none;
+        border-radius: 10px;
+        padding: 8px 12px;
+        background-color: #57B4BA; /* Updated to teal shade */
+        color: white;
+        margin-left: 10px;
+    }
+
+    .stButton > button:hover {
+        background-color: #468C91; /* Slightly darker teal for hover */
+    }
+
+    /* WhatsApp-style chat bubbles */
+    .chat-bubble {
+        max-width: 70%;
+        padding: 10px;
+        border-radius: 10px;
+        margin: 5px 0;
+        display: inline-block;
+    }
+
+    /* Dynamic placeholder color based on theme */
+    [data-baseweb="input"] input::placeholder {
+        color: #888; /* Default for light mode */
+    }
+
+    body[theme-mode="dark"] [data-baseweb="input"] input::placeholder {
+        color: #ccc; /* Lighter gray for dark mode */
+    }
+    </style>
+"""
+
+# Function to initialize the session's theme state and apply the initial theme and CSS
+def init_theme():
+    if "themes" not in st.session_state:
+        st.session_state.themes = {"current_theme": "light", "refreshed": True, **THEMES}
+    if st.session_state.themes["refreshed"]:
+        change_theme()
+    st.markdown(CHAT_CSS, unsafe_allow_html=True)
+
+# Function to change theme
+def change_theme():
+    previous_theme = st.session_state.themes["current_theme"]
+    tdict = st.session_state.themes["light"] if previous_theme == "light" else st.session_state.themes["dark"]
+
+    for vkey, vval in tdict.items():
+        if vkey.startswith("theme"):
+            st._config.set_option(vkey, vval)
+
+    st.session_state.themes["refreshed"] = False
+    st.session_state.themes["current_theme"] = "dark" if previous_theme == "light" else "light"
+
+# Function to draw the sidebar theme toggle button
+def theme_toggle():
+    current_theme = st.session_state.themes["current_theme"]
+    if st.sidebar.button(
+        st.session_state.themes[current_theme]["button_face"] + " Toggle Theme",
+        key="theme_toggle"
+    ):
+        change_theme()
+        st.rerun()
+
+# Function to get (user bubble, bot bubble, text) colors for the current theme
+def bubble_colors():
+    current = st.session_state.themes[st.session_state.themes["current_theme"]]
+    return USER_BUBBLE_COLOR, current["theme.secondaryBackgroundColor"], current["theme.textColor"]